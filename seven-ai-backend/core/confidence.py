@@ -4,15 +4,24 @@ Uses sentence-transformers to detect query clarity and confidence
 """
 
 from typing import Dict, List, Tuple, Optional
+from collections import Counter
+from functools import lru_cache
+import hashlib
+import json
+import os
 import numpy as np
 
-# Try to import sentence-transformers (optional dependency)
+from core.embedding_singleton import get_embedder, embedder_signature
+
+# Directory for cached intent embedding matrices
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./data/cache")
+
+# Try to import pyahocorasick for single-pass keyword matching (optional dependency)
 try:
-    from sentence_transformers import SentenceTransformer
-    TRANSFORMERS_AVAILABLE = True
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    TRANSFORMERS_AVAILABLE = False
-    print("WARNING: sentence-transformers not available for confidence scoring")
+    AHOCORASICK_AVAILABLE = False
 
 
 class ConfidenceScorer:
@@ -64,46 +73,147 @@ class ConfidenceScorer:
     # Confidence threshold (below this, ask clarifying question)
     CONFIDENCE_THRESHOLD = 0.7
     
+    # Single-word queries that refer to nothing specific
+    VAGUE_REFERENCES = frozenset({"it", "that", "this", "thing", "something"})
+    
+    # Single-word closings/acknowledgements that still get the full model
+    CONVERSATIONAL_WORDS = frozenset({"thanks", "thank", "thx", "ty", "bye", "goodbye", "ok", "okay"})
+    
+    # Max number of distinct query embeddings kept in memory
+    QUERY_CACHE_SIZE = 2048
+    
     def __init__(self):
         """Initialize confidence scorer"""
         self.model = None
-        self.intent_embeddings = {}
+        self.intent_labels: List[str] = []
+        self.intent_matrix: Optional[np.ndarray] = None
+        self.intent_matrix_i8: Optional[np.ndarray] = None
+        self.intent_scale = 1.0
+        self._encode_cached = lru_cache(maxsize=self.QUERY_CACHE_SIZE)(self._encode_query)
+        self._intent_counts = {
+            intent: len(patterns) for intent, patterns in self.INTENT_PATTERNS.items()
+        }
+        self._automaton = self._build_automaton() if AHOCORASICK_AVAILABLE else None
         
-        if TRANSFORMERS_AVAILABLE:
+        # Lightweight MiniLM model, shared with the other embedding users
+        model = get_embedder()
+        if model is not None:
             try:
-                # Use a lightweight model for speed
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                self.model = model
                 self._precompute_intent_embeddings()
                 print("SUCCESS: Confidence scorer initialized with sentence-transformers")
             except Exception as e:
-                print(f"WARNING: Failed to load sentence-transformers model: {e}")
+                print(f"WARNING: Failed to precompute intent embeddings: {e}")
                 self.model = None
     
+    def _build_automaton(self):
+        """Build an Aho-Corasick automaton over all intent patterns"""
+        automaton = ahocorasick.Automaton()
+        for intent, patterns in self.INTENT_PATTERNS.items():
+            for pattern in patterns:
+                automaton.add_word(pattern, (intent, pattern))
+        automaton.make_automaton()
+        return automaton
+    
     def _precompute_intent_embeddings(self):
-        """Precompute embeddings for intent patterns"""
+        """Precompute a (num_intents, dim) matrix of L2-normalized intent embeddings"""
         if not self.model:
             return
         
-        for intent, patterns in self.INTENT_PATTERNS.items():
-            # Compute embedding for each pattern
-            embeddings = self.model.encode(patterns)
-            # Store average embedding for this intent
-            self.intent_embeddings[intent] = np.mean(embeddings, axis=0)
+        cached = self._load_intent_cache()
+        if cached is not None:
+            labels, matrix = cached
+        else:
+            labels = list(self.INTENT_PATTERNS.keys())
+            matrix = self._encode_intent_matrix()
+            self._save_intent_cache(labels, matrix)
+        
+        self.intent_labels = labels
+        self.intent_matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.intent_matrix_i8, self.intent_scale = self._quantize_int8(self.intent_matrix)
     
-    def is_available(self) -> bool:
-        """Check if confidence scoring is available"""
-        return self.model is not None
+    def _encode_intent_matrix(self) -> np.ndarray:
+        """Encode all intent patterns and average them per intent"""
+        # Flatten all patterns so they are encoded in a single batch
+        all_patterns = []
+        offsets = [0]
+        for patterns in self.INTENT_PATTERNS.values():
+            all_patterns.extend(patterns)
+            offsets.append(len(all_patterns))
+        
+        all_embeddings = self.model.encode(
+            all_patterns,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        
+        # Average embedding per intent
+        means = [
+            all_embeddings[offsets[i]:offsets[i + 1]].mean(axis=0)
+            for i in range(len(offsets) - 1)
+        ]
+        
+        matrix = np.vstack(means).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+        return matrix
+    
+    def _intent_cache_paths(self) -> Tuple[str, str]:
+        """Cache file paths, keyed by the intent patterns and how the model runs (backend, device, dtype)"""
+        payload = json.dumps(self.INTENT_PATTERNS, sort_keys=True).encode() + embedder_signature(self.model).encode()
+        key = hashlib.sha256(payload).hexdigest()[:16]
+        base = os.path.join(EMBEDDING_CACHE_DIR, f"intent_{key}")
+        return f"{base}.npy", f"{base}.json"
     
-    def cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+    def _load_intent_cache(self) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Memory-map a previously saved intent matrix, if present"""
+        matrix_path, labels_path = self._intent_cache_paths()
+        if not (os.path.exists(matrix_path) and os.path.exists(labels_path)):
+            return None
+        
+        try:
+            with open(labels_path, 'r', encoding='utf-8') as f:
+                labels = json.load(f)
+            matrix = np.load(matrix_path, mmap_mode='r')
+        except Exception as e:
+            print(f"WARNING: Failed to load intent embedding cache: {e}")
+            return None
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        if matrix.shape[0] != len(labels):
+            return None
         
-        return float(dot_product / (norm1 * norm2))
+        return labels, matrix
+    
+    def _save_intent_cache(self, labels: List[str], matrix: np.ndarray):
+        """Persist the intent matrix so later startups skip encoding"""
+        matrix_path, labels_path = self._intent_cache_paths()
+        try:
+            os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+            np.save(matrix_path, matrix)
+            with open(labels_path, 'w', encoding='utf-8') as f:
+                json.dump(labels, f)
+        except Exception as e:
+            print(f"WARNING: Failed to save intent embedding cache: {e}")
+    
+    @staticmethod
+    def _quantize_int8(values: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Symmetric int8 quantization, returns (quantized, scale)"""
+        max_abs = float(np.max(np.abs(values)))
+        scale = 127.0 / max_abs if max_abs > 0 else 1.0
+        quantized = np.round(values * scale).astype(np.int8)
+        return quantized, scale
+    
+    def _encode_query(self, query_key: str) -> np.ndarray:
+        """Encode and L2-normalize a query (wrapped by an LRU cache in __init__)"""
+        embedding = self.model.encode([query_key])[0].astype(np.float32)
+        embedding /= np.linalg.norm(embedding) + 1e-12
+        # Cached arrays are shared between callers, so keep them read-only
+        embedding.setflags(write=False)
+        return embedding
+    
+    def is_available(self) -> bool:
+        """Check if confidence scoring is available"""
+        return self.model is not None
     
     def detect_intent(self, query: str) -> Tuple[str, float]:
         """
@@ -115,29 +225,36 @@ class ConfidenceScorer:
         Returns:
             Tuple of (intent, confidence_score)
         """
+        if not isinstance(query, str):
+            raise TypeError(f"query must be a str, got {type(query).__name__}")
+        
+        query_key = query.strip().lower()
+        if not query_key:
+            return "unknown", 0.0
+        
         if not self.is_available():
             # Fallback to simple keyword matching
             return self._simple_intent_detection(query)
         
         try:
-            # Encode the query
-            query_embedding = self.model.encode([query])[0]
-            
-            # Compare with all intent embeddings
-            best_intent = "unknown"
-            best_similarity = 0.0
-            
-            for intent, intent_embedding in self.intent_embeddings.items():
-                similarity = self.cosine_similarity(query_embedding, intent_embedding)
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_intent = intent
-            
-            return best_intent, best_similarity
-        
-        except Exception as e:
+            # Encode and normalize the query (repeats skip the transformer)
+            query_embedding = self._encode_cached(query_key)
+        except RuntimeError as e:
+            # Model runtime failures (e.g. out of memory) fall back to keywords
             print(f"⚠️ Intent detection error: {e}")
             return self._simple_intent_detection(query)
+        
+        # Cosine similarity against all intents in a single int8 matmul
+        query_i8, query_scale = self._quantize_int8(query_embedding)
+        scores = self.intent_matrix_i8.astype(np.int32) @ query_i8.astype(np.int32)
+        scores = scores / (self.intent_scale * query_scale)
+        best = int(scores.argmax())
+        best_similarity = float(scores[best])
+        
+        if best_similarity <= 0.0:
+            return "unknown", 0.0
+        
+        return self.intent_labels[best], best_similarity
     
     def _simple_intent_detection(self, query: str) -> Tuple[str, float]:
         """
@@ -154,10 +271,19 @@ class ConfidenceScorer:
         best_intent = "unknown"
         best_score = 0.0
         
-        for intent, patterns in self.INTENT_PATTERNS.items():
+        if self._automaton is not None:
+            # Single pass over the query; each pattern counts once like `in` would
+            matched = {value for _, value in self._automaton.iter(query_lower)}
+            hits = Counter(intent for intent, _ in matched)
+        else:
+            hits = Counter({
+                intent: sum(1 for pattern in patterns if pattern in query_lower)
+                for intent, patterns in self.INTENT_PATTERNS.items()
+            })
+        
+        for intent, count in self._intent_counts.items():
             # Count matching keywords
-            matches = sum(1 for pattern in patterns if pattern in query_lower)
-            score = matches / len(patterns) if patterns else 0.0
+            score = hits[intent] / count if count else 0.0
             
             if score > best_score:
                 best_score = score
@@ -182,6 +308,17 @@ class ConfidenceScorer:
         _, confidence = self.detect_intent(query)
         return confidence < self.CONFIDENCE_THRESHOLD
     
+    def _query_features(self, query: str) -> Dict:
+        """Derive the cheap lexical features used by analyze_query in one place"""
+        query_lower = query.lower()
+        tokens = query_lower.split()
+        return {
+            "word_count": len(tokens),
+            "question_marks": query.count("?"),
+            "has_what": "what" in query_lower,
+            "vague_reference": len(tokens) == 1 and tokens[0] in self.VAGUE_REFERENCES
+        }
+    
     def analyze_query(self, query: str) -> Dict:
         """
         Comprehensive query analysis
@@ -192,23 +329,43 @@ class ConfidenceScorer:
         Returns:
             Dictionary with analysis results
         """
-        intent, confidence = self.detect_intent(query)
+        features = self._query_features(query)
+        
+        # Empty queries need no model at all
+        if features["word_count"] == 0:
+            return {
+                "query": query,
+                "intent": "unknown",
+                "confidence": 0.0,
+                "is_ambiguous": True,
+                "needs_clarification": True,
+                "ambiguity_reasons": ["empty_query"],
+                "threshold": self.CONFIDENCE_THRESHOLD
+            }
+        
+        word_count = features["word_count"]
+        
+        # Single words that match no intent keyword are ambiguous anyway; skip the
+        # transformer for them. Keyword hits ("hello", "weather") and closings
+        # ("thanks") are scored by the model as before.
+        if word_count < 2:
+            intent, confidence = self._simple_intent_detection(query)
+            if confidence > 0.0 or query.strip().lower().strip("!.?") in self.CONVERSATIONAL_WORDS:
+                intent, confidence = self.detect_intent(query)
+        else:
+            intent, confidence = self.detect_intent(query)
         is_ambiguous = confidence < self.CONFIDENCE_THRESHOLD
         
         # Detect specific ambiguity reasons
         ambiguity_reasons = []
         
-        if len(query.strip()) == 0:
-            ambiguity_reasons.append("empty_query")
-            is_ambiguous = True
-            confidence = 0.0
-        elif len(query.split()) < 3:
+        if word_count < 3:
             ambiguity_reasons.append("too_short")
-        elif "what" in query.lower() and "?" not in query:
+        elif features["has_what"] and features["question_marks"] == 0:
             ambiguity_reasons.append("incomplete_question")
-        elif query.lower() in ["it", "that", "this", "thing", "something"]:
+        elif features["vague_reference"]:
             ambiguity_reasons.append("vague_reference")
-        elif query.count("?") > 2:
+        elif features["question_marks"] > 2:
             ambiguity_reasons.append("multiple_questions")
         
         return {
@@ -3,9 +3,21 @@ Conversation Context Management
 Tracks topics, maintains multi-turn context, and enables smooth transitions
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
 from datetime import datetime
 import json
+import os
+import re
+import time
+
+from core.embedding_singleton import get_embedder
+
+# Topic classifier backend: "embedding" (shared MiniLM) or "bart" (zero-shot NLI)
+TOPIC_CLASSIFIER = os.getenv("TOPIC_CLASSIFIER", "embedding").lower()
+
+# Topic is coarse, so only the first N words are classified
+MAX_TOPIC_WORDS = 64
 
 # Lazy imports
 _classifier = None
@@ -34,15 +46,31 @@ def _get_classifier():
 class ConversationTopic:
     """Represents a conversation topic with context"""
     
+    __slots__ = (
+        "topic", "keywords", "messages", "confidence",
+        "start_time", "last_updated_ns", "message_count"
+    )
+    
     def __init__(self, topic: str, keywords: List[str], messages: List[str], confidence: float = 1.0):
         self.topic = topic
         self.keywords = keywords
         self.messages = messages  # Last few messages about this topic
         self.confidence = confidence
         self.start_time = datetime.now()
-        self.last_updated = datetime.now()
+        self.last_updated_ns = time.monotonic_ns()  # Cheap clock for per-message updates
         self.message_count = len(messages)
     
+    @property
+    def last_updated(self) -> datetime:
+        """Wall-clock time of the last update, derived from the monotonic clock"""
+        elapsed = (time.monotonic_ns() - self.last_updated_ns) / 1e9
+        return datetime.fromtimestamp(time.time() - elapsed)
+    
+    @last_updated.setter
+    def last_updated(self, value: datetime):
+        elapsed = time.time() - value.timestamp()
+        self.last_updated_ns = time.monotonic_ns() - int(elapsed * 1e9)
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for storage"""
         return {
@@ -74,7 +102,7 @@ class ConversationTopic:
         self.messages.append(message)
         if len(self.messages) > max_messages:
             self.messages = self.messages[-max_messages:]  # Keep last N messages
-        self.last_updated = datetime.now()
+        self.last_updated_ns = time.monotonic_ns()
         self.message_count += 1
     
     def get_summary(self) -> str:
@@ -107,14 +135,48 @@ class ConversationContext:
         "general_conversation"
     ]
     
+    # Stop words filtered out of topic keywords
+    STOP_WORDS = frozenset({
+        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+        'with', 'by', 'is', 'are', 'was', 'were', 'been', 'be', 'have', 'has', 'had',
+        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can', 'may', 'might',
+        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'this', 'that', 'these', 'those'
+    })
+    
+    # Smaller stop word set used when no classifier is available
+    SIMPLE_STOP_WORDS = frozenset({
+        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'
+    })
+    
+    # Phrases signalling the user wants to change the subject
+    RESET_PHRASES = (
+        "new topic",
+        "change topic",
+        "different topic",
+        "talk about something else",
+        "let's talk about",
+        "anyway",
+        "by the way",
+        "speaking of which",
+        "on a different note"
+    )
+    _RESET_RE = re.compile("|".join(re.escape(phrase) for phrase in RESET_PHRASES))
+    
+    # Max archived topics kept in memory
+    MAX_TOPIC_HISTORY = 64
+    
     def __init__(self):
         """Initialize conversation context manager"""
         self.available = self._check_available()
         
         # Current conversation state
-        self.current_topics: List[ConversationTopic] = []  # Last 3 topics
+        self.current_topics: Deque[ConversationTopic] = deque(maxlen=3)  # Last 3 topics
         self.current_topic: Optional[ConversationTopic] = None
-        self.topic_history: List[ConversationTopic] = []
+        self.topic_history: Deque[ConversationTopic] = deque(maxlen=self.MAX_TOPIC_HISTORY)
+        self.topic_count = 0  # Total topics seen, not capped like topic_history
+        
+        # Label embeddings per candidate topic list, computed on first use
+        self._topic_embeddings: Dict[Tuple[str, ...], object] = {}
         
     def _check_available(self) -> bool:
         """Check if topic detection is available"""
@@ -144,17 +206,28 @@ class ConversationContext:
             return "general_conversation", 0.5, self._extract_simple_keywords(text)
         
         try:
-            classifier = _get_classifier()
-            if classifier is None:
-                return "general_conversation", 0.5, self._extract_simple_keywords(text)
-            
             topics = candidate_topics or self.DEFAULT_TOPICS
             
-            # Classify
-            result = classifier(text, topics, multi_label=False)
+            # Cap input length; long messages would dominate attention cost
+            words = text.split()
+            topic_text = " ".join(words[:MAX_TOPIC_WORDS]) if len(words) > MAX_TOPIC_WORDS else text
             
-            main_topic = result['labels'][0]
-            confidence = result['scores'][0]
+            detected = None
+            if TOPIC_CLASSIFIER == "embedding":
+                detected = self._detect_topic_embedding(topic_text, topics)
+            
+            if detected is not None:
+                main_topic, confidence = detected
+            else:
+                classifier = _get_classifier()
+                if classifier is None:
+                    return "general_conversation", 0.5, self._extract_simple_keywords(text)
+                
+                # Classify
+                result = classifier(topic_text, topics, multi_label=False)
+                
+                main_topic = result['labels'][0]
+                confidence = result['scores'][0]
             
             # Extract keywords
             keywords = self._extract_keywords(text, main_topic)
@@ -167,25 +240,41 @@ class ConversationContext:
             print(f"⚠️ Topic detection failed: {e}")
             return "general_conversation", 0.5, self._extract_simple_keywords(text)
     
-    def _extract_keywords(self, text: str, topic: str) -> List[str]:
-        """Extract keywords from text"""
-        # Simple keyword extraction (can be enhanced with NLP)
-        words = text.lower().split()
+    def _detect_topic_embedding(self, text: str, topics: List[str]) -> Optional[Tuple[str, float]]:
+        """
+        Zero-shot topic detection by cosine similarity against label embeddings
+        
+        Returns:
+            Tuple of (topic, similarity), or None if no embedder is loaded
+        """
+        embedder = get_embedder()
+        if embedder is None:
+            return None
         
-        # Filter stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'been', 'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can', 'may', 'might', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'this', 'that', 'these', 'those'}
+        key = tuple(topics)
+        topic_embeddings = self._topic_embeddings.get(key)
+        if topic_embeddings is None:
+            labels = [topic.replace("_", " ") for topic in topics]
+            topic_embeddings = embedder.encode(labels, normalize_embeddings=True)
+            self._topic_embeddings[key] = topic_embeddings
         
-        keywords = [w for w in words if w not in stop_words and len(w) > 3]
+        query_embedding = embedder.encode([text], normalize_embeddings=True)[0]
+        scores = topic_embeddings @ query_embedding
+        best = int(scores.argmax())
         
-        # Take top 5 unique keywords
-        return list(set(keywords))[:5]
+        return topics[best], float(scores[best])
+    
+    def _extract_keywords(self, text: str, topic: Optional[str] = None,
+                          stop_words: frozenset = STOP_WORDS) -> List[str]:
+        """Extract up to 5 unique keywords from text, in order of appearance"""
+        # Simple keyword extraction (can be enhanced with NLP)
+        words = text.lower().split()
+        keywords = (w for w in words if len(w) > 3 and w not in stop_words)
+        return list(dict.fromkeys(keywords))[:5]
     
     def _extract_simple_keywords(self, text: str) -> List[str]:
         """Simple keyword extraction without ML"""
-        words = text.lower().split()
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for'}
-        keywords = [w for w in words if w not in stop_words and len(w) > 3]
-        return list(set(keywords))[:5]
+        return self._extract_keywords(text, stop_words=self.SIMPLE_STOP_WORDS)
     
     def update_context(self, user_message: str, assistant_message: str) -> Dict:
         """
@@ -209,11 +298,8 @@ class ConversationContext:
             # Save current topic to history
             if self.current_topic:
                 self.topic_history.append(self.current_topic)
-                self.current_topics.append(self.current_topic)
-                
-                # Keep only last 3 topics
-                if len(self.current_topics) > 3:
-                    self.current_topics = self.current_topics[-3:]
+                self.topic_count += 1
+                self.current_topics.append(self.current_topic)  # Oldest drops off
             
             # Create new topic
             self.current_topic = ConversationTopic(
@@ -235,7 +321,7 @@ class ConversationContext:
             "confidence": confidence,
             "keywords": keywords,
             "topic_changed": topic_changed,
-            "topic_history": [t.get_summary() for t in self.current_topics[-3:]],
+            "topic_history": [t.get_summary() for t in self.current_topics],
             "message_count": self.current_topic.message_count
         }
     
@@ -253,7 +339,7 @@ class ConversationContext:
         
         # Recent topics
         if len(self.current_topics) > 0:
-            recent_topics = [t.topic for t in self.current_topics[-3:]]
+            recent_topics = [t.topic for t in self.current_topics]
             summary_parts.append(f"Recent topics: {', '.join(recent_topics)}")
         
         # Current topic with details
@@ -276,44 +362,29 @@ class ConversationContext:
         Returns:
             True if user wants to reset context
         """
-        reset_phrases = [
-            "new topic",
-            "change topic",
-            "different topic",
-            "talk about something else",
-            "let's talk about",
-            "anyway",
-            "by the way",
-            "speaking of which",
-            "on a different note"
-        ]
-        
-        message_lower = message.lower()
-        
-        for phrase in reset_phrases:
-            if phrase in message_lower:
-                print(f"🔄 Topic reset triggered by: '{phrase}'")
-                return True
+        match = self._RESET_RE.search(message.lower())
+        if match is None:
+            return False
         
-        return False
+        print(f"🔄 Topic reset triggered by: '{match.group(0)}'")
+        return True
     
     def reset_current_topic(self):
         """Reset current topic (user requested topic change)"""
         if self.current_topic:
             self.topic_history.append(self.current_topic)
+            self.topic_count += 1
             self.current_topics.append(self.current_topic)
-            
-            if len(self.current_topics) > 3:
-                self.current_topics = self.current_topics[-3:]
         
         self.current_topic = None
         print("🔄 Current topic reset")
     
     def reset_all(self):
         """Reset all conversation context (new chat)"""
-        self.current_topics = []
+        self.current_topics.clear()
         self.current_topic = None
-        self.topic_history = []
+        self.topic_history.clear()
+        self.topic_count = 0
         print("🗑️ All conversation context reset")
     
     def get_transition_prompt(self) -> str:
@@ -341,19 +412,23 @@ class ConversationContext:
         return {
             "current_topics": [t.to_dict() for t in self.current_topics],
             "current_topic": self.current_topic.to_dict() if self.current_topic else None,
-            "topic_count": len(self.topic_history)
+            "topic_count": self.topic_count
         }
     
     def from_dict(self, data: Dict):
         """Load context from dictionary"""
-        self.current_topics = [
-            ConversationTopic.from_dict(t) for t in data.get("current_topics", [])
-        ]
+        self.current_topics = deque(
+            (ConversationTopic.from_dict(t) for t in data.get("current_topics", [])),
+            maxlen=3
+        )
         
         if data.get("current_topic"):
             self.current_topic = ConversationTopic.from_dict(data["current_topic"])
         else:
             self.current_topic = None
+        
+        # Contexts saved without the counter: count the archived topics that were stored
+        self.topic_count = data.get("topic_count", len(self.current_topics))
 
 
 # Singleton instance
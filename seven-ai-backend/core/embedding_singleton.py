@@ -0,0 +1,117 @@
+"""
+Shared Embedding Model
+Lazily loads a single sentence-transformers model shared by all callers
+"""
+
+import os
+import threading
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Inference backend: "torch" (default) or "onnx" (needs sentence-transformers[onnx])
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# torch.compile the transformer on GPU (compiled artifacts honour TORCHINDUCTOR_CACHE_DIR)
+EMBEDDING_COMPILE = os.getenv("EMBEDDING_COMPILE", "false").lower() == "true"
+# Device override ("cpu", "cuda", "mps"); auto-detected when unset
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE")
+
+# Lazy singleton (False means loading failed, don't retry)
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def _configure_torch_threads():
+    """Apply TORCH_NUM_THREADS once, before the first model load"""
+    num_threads = os.getenv("TORCH_NUM_THREADS")
+    if not num_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(int(num_threads))
+    except Exception as e:
+        print(f"WARNING: Failed to set torch threads: {e}")
+
+
+def _select_device():
+    """Pick the fastest available device: CUDA, then Apple MPS, then CPU"""
+    if EMBEDDING_DEVICE:
+        return EMBEDDING_DEVICE
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+    
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+def _optimize_torch_model(model):
+    """Use FP16 (and optionally torch.compile) when running on a GPU"""
+    try:
+        import torch
+    except ImportError:
+        return model
+    
+    if model.device.type != "cuda":
+        return model
+    
+    model = model.half()
+    
+    if EMBEDDING_COMPILE:
+        try:
+            # Compile the inner transformer so SentenceTransformer.encode keeps working
+            transformer = model[0]
+            transformer.auto_model = torch.compile(transformer.auto_model, mode="reduce-overhead")
+        except Exception as e:
+            print(f"WARNING: torch.compile failed, using eager model: {e}")
+    
+    return model
+
+
+def _load_model(model_cls):
+    """Load the embedding model on the configured backend, falling back to torch"""
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            return model_cls(EMBEDDING_MODEL_NAME, backend="onnx")
+        except Exception as e:
+            print(f"WARNING: ONNX backend unavailable, falling back to torch: {e}")
+    
+    device = _select_device()
+    print(f"INFO: Embedding model device: {device}")
+    return _optimize_torch_model(model_cls(EMBEDDING_MODEL_NAME, device=device))
+
+
+def embedder_signature(model) -> str:
+    """Describe how a loaded embedder computes vectors (model, backend, device, dtype), for cache keys"""
+    backend = getattr(model, "backend", "torch")
+    device = str(getattr(model, "device", "cpu"))
+    try:
+        dtype = str(next(model.parameters()).dtype)
+    except Exception:
+        dtype = "none"  # e.g. ONNX models expose no torch parameters
+    return f"{EMBEDDING_MODEL_NAME}|{backend}|{device}|{dtype}"
+
+
+def get_embedder():
+    """Return the shared SentenceTransformer, or None if unavailable"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _configure_torch_threads()
+                    print(f"🧠 Loading embedding model ({EMBEDDING_MODEL_NAME})...")
+                    _embedder = _load_model(SentenceTransformer)
+                    print("✅ Embedding model loaded")
+                except ImportError:
+                    print("WARNING: sentence-transformers not available")
+                    _embedder = False
+                except Exception as e:
+                    print(f"WARNING: Failed to load sentence-transformers model: {e}")
+                    _embedder = False
+    return _embedder if _embedder is not False else None
@@ -4,44 +4,523 @@ Detects user sentiment and emotion from text and voice
 """
 
 import os
-from typing import Dict, Optional, Tuple
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
-# Lazy import transformers and librosa to avoid loading on startup
+# Sentiment model and where its INT8 ONNX export is cached.
+# Default is a 2-layer BERT student distilled on SST-2; set
+# SENTIMENT_MODEL=distilbert-base-uncased-finetuned-sst-2-english for the larger teacher-class model.
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "philschmid/tiny-bert-sst2-distilled")
+SENTIMENT_CACHE_DIR = os.path.join(
+    os.getenv("SENTIMENT_CACHE_DIR", "./data/cache/sentiment-int8"),
+    SENTIMENT_MODEL.replace("/", "--")
+)
+
+# Voice features only need the band below 4 kHz, so audio is analyzed at 16 kHz mono
+ANALYSIS_SAMPLE_RATE = 16000
+
+AUDIO_BLOCK_SIZE = 4096  # Samples decoded per block
+
+# Upload content types that mean headerless mono 16-bit little-endian PCM;
+# everything else is decoded by soundfile
+RAW_PCM_CONTENT_TYPES = frozenset({"audio/l16", "audio/pcm", "audio/raw", "audio/x-raw"})
+
+# Voice feature extraction STFT parameters
+STFT_FRAME = 2048
+STFT_HOP = 512
+PITCH_FMIN = 150.0  # Same band as librosa.piptrack defaults
+PITCH_FMAX = 4000.0
+PITCH_THRESHOLD = 0.1  # Frame peak must exceed this fraction of the clip peak
+TEMPO_MIN_BPM = 30.0
+TEMPO_MAX_BPM = 300.0
+
+# Text confidence at which analyze_combined trusts the text alone and skips the voice path
+TEXT_CONFIDENCE_SATURATION = 0.9
+
+# Keywords that refine a high-confidence sentiment into a specific emotion.
+# Matched as whole tokens, so "mad" no longer fires on "made".
+EMOTION_KEYWORDS = {
+    "grateful": frozenset({"thanks", "thank", "thx", "grateful", "appreciate", "appreciated"}),
+    "excited": frozenset({"!", "amazing", "awesome", "great", "excellent"}),
+    "angry": frozenset({"angry", "mad", "furious", "hate"}),
+    "worried": frozenset({"worried", "anxious", "scared", "afraid", "nervous"}),
+    "frustrated": frozenset({"frustrated", "annoyed", "irritated"}),
+}
+
+# Words, plus "!" as its own token
+_TOKEN_RE = re.compile(r"[a-z]+|!")
+
+# Try to import pyahocorasick for single-pass keyword matching (optional dependency)
+try:
+    import ahocorasick
+    _keyword_automaton = ahocorasick.Automaton()
+    for _emotion, _words in EMOTION_KEYWORDS.items():
+        for _word in _words:
+            _keyword_automaton.add_word(_word, (len(_word), _emotion))
+    _keyword_automaton.make_automaton()
+except ImportError:
+    _keyword_automaton = None
+
+
+def _is_word_char(char: str) -> bool:
+    """True for characters that _TOKEN_RE joins into one word token"""
+    return "a" <= char <= "z"
+
+
+def _match_emotion_keywords(text_lower: str) -> set:
+    """Return the set of emotions whose keywords occur as tokens in the (lowercased) text"""
+    if _keyword_automaton is not None:
+        # One automaton pass; a hit counts only if it is a whole token, as with _TOKEN_RE
+        matches = set()
+        last = len(text_lower) - 1
+        for end, (length, emotion) in _keyword_automaton.iter(text_lower):
+            start = end - length + 1
+            if text_lower[end] == "!" or (
+                (start == 0 or not _is_word_char(text_lower[start - 1]))
+                and (end == last or not _is_word_char(text_lower[end + 1]))
+            ):
+                matches.add(emotion)
+        return matches
+    
+    tokens = frozenset(_TOKEN_RE.findall(text_lower))
+    return {emotion for emotion, words in EMOTION_KEYWORDS.items() if not words.isdisjoint(tokens)}
+
+
+# Lazy import transformers and the voice feature kernel to avoid loading on startup
 _sentiment_pipeline = None
-_librosa = None
+_voice_kernel = None
+
+# Runs text and voice analysis side by side in analyze_combined
+_analysis_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="emotion-analysis")
+
+
+class _QuantizedSentimentClassifier:
+    """Pipeline-compatible wrapper around an INT8 ONNX Runtime sentiment model"""
+    
+    def __init__(self, model, tokenizer):
+        self.session = model.model
+        self.tokenizer = tokenizer
+        self.id2label = model.config.id2label
+        self.input_names = {i.name for i in self.session.get_inputs()}
+    
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=512, return_tensors="np"
+        )
+        feeds = {name: value for name, value in encoded.items() if name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        
+        # Softmax over labels
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        
+        best = probs.argmax(axis=1)
+        return [
+            {"label": self.id2label[int(i)], "score": float(probs[row, i])}
+            for row, i in enumerate(best)
+        ]
+
+
+def _load_quantized_sentiment():
+    """Export the sentiment model to ONNX and dynamically quantize it to INT8 (cached on disk)"""
+    import onnxruntime
+    if "CPUExecutionProvider" not in onnxruntime.get_available_providers():
+        raise RuntimeError("ONNX Runtime CPU provider not available")
+    
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    
+    quantized_file = "model_quantized.onnx"
+    if not os.path.exists(os.path.join(SENTIMENT_CACHE_DIR, quantized_file)):
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_MODEL, export=True)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=True)
+        quantizer.quantize(save_dir=SENTIMENT_CACHE_DIR, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(SENTIMENT_MODEL, use_fast=True).save_pretrained(SENTIMENT_CACHE_DIR)
+    
+    model = ORTModelForSequenceClassification.from_pretrained(
+        SENTIMENT_CACHE_DIR, file_name=quantized_file
+    )
+    tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_CACHE_DIR, use_fast=True)
+    return _QuantizedSentimentClassifier(model, tokenizer)
 
 
 def _get_sentiment_pipeline():
-    """Lazy load sentiment analysis pipeline"""
+    """Lazy load sentiment analysis pipeline (INT8 ONNX Runtime when available)"""
     global _sentiment_pipeline
     if _sentiment_pipeline is None:
+        print("🧠 Loading sentiment analysis model...")
         try:
-            from transformers import pipeline
-            print("🧠 Loading sentiment analysis model...")
-            _sentiment_pipeline = pipeline(
-                "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
-                device=-1  # Use CPU
-            )
-            print("✅ Sentiment model loaded")
+            _sentiment_pipeline = _load_quantized_sentiment()
+            print("✅ Sentiment model loaded (INT8 ONNX Runtime)")
         except Exception as e:
-            print(f"❌ Failed to load sentiment model: {e}")
-            _sentiment_pipeline = False
+            print(f"⚠️ Quantized sentiment model unavailable, using PyTorch: {e}")
+            try:
+                from transformers import pipeline
+                _sentiment_pipeline = pipeline(
+                    "sentiment-analysis",
+                    model=SENTIMENT_MODEL,
+                    device=-1  # Use CPU
+                )
+                print("✅ Sentiment model loaded")
+            except Exception as e:
+                print(f"❌ Failed to load sentiment model: {e}")
+                _sentiment_pipeline = False
     return _sentiment_pipeline if _sentiment_pipeline is not False else None
 
 
-def _get_librosa():
-    """Lazy load librosa"""
-    global _librosa
-    if _librosa is None:
+class _BatchedSentiment:
+    """
+    Coalesces concurrent sentiment requests into one batched forward pass
+    
+    A background worker takes the first pending text and, if more are already
+    queued, keeps collecting for up to max_wait_ms (or max_batch items). A lone
+    request is run immediately without waiting.
+    """
+    
+    def __init__(self, max_batch: int = 16, max_wait_ms: float = 5.0):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+    
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Classify one text, blocking until its batch has run"""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+    
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="sentiment-batcher", daemon=True
+                    )
+                    self._worker.start()
+    
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        if self._queue.empty():
+            return batch  # Single-item fast path
+        
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                pipeline = _get_sentiment_pipeline()
+                if pipeline is None:
+                    raise RuntimeError("Sentiment model not available")
+                results = pipeline(texts, batch_size=len(texts), truncation=True)
+                for (_, future), result in zip(batch, results):
+                    # Students may use lowercase labels; callers expect POSITIVE/NEGATIVE
+                    future.set_result((result['label'].upper(), result['score']))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+_sentiment_batcher = _BatchedSentiment()
+
+
+@lru_cache(maxsize=4096)
+def _classify_sentiment_cached(text_key: str) -> Tuple[str, float]:
+    """Sentiment for normalized text; repeats ("ok", "thanks") skip the model"""
+    return _sentiment_batcher.classify(text_key)
+
+
+def _sentiment_cache_key(pipeline, text: str) -> str:
+    """Cache key for a text: lowercased only if the model's tokenizer lowercases anyway"""
+    key = text[:512].strip()  # Limit text length
+    if getattr(getattr(pipeline, "tokenizer", None), "do_lower_case", False):
+        return key.lower()
+    return key
+
+
+def _voice_frame_features(S, prev, freqs, power_weights, power_scale,
+                          peak_freqs, peak_mags, frame_rms, onset):
+    """
+    Per-frame features from one block of a magnitude spectrogram
+    
+    S is (frames, bins). For each frame this writes the peak bin in the pitch
+    band, the frame RMS via Parseval, and the spectral-flux onset strength
+    against the previous frame. prev holds the last frame of the previous
+    block and is updated in place. Written in plain loops so numba can compile it.
+    """
+    n_frames, n_bins = S.shape
+    
+    for t in range(n_frames):
+        energy = 0.0
+        flux = 0.0
+        best_mag = 0.0
+        best_freq = 0.0
+        for k in range(n_bins):
+            mag = S[t, k]
+            energy += power_weights[k] * mag * mag
+            diff = np.log1p(mag) - np.log1p(prev[k])
+            if diff > 0.0:
+                flux += diff
+            prev[k] = mag
+            if PITCH_FMIN <= freqs[k] <= PITCH_FMAX and mag > best_mag:
+                best_mag = mag
+                best_freq = freqs[k]
+        
+        peak_freqs[t] = best_freq
+        peak_mags[t] = best_mag
+        frame_rms[t] = np.sqrt(energy * power_scale)
+        onset[t] = flux
+
+
+def _onset_tempo(onset, frame_seconds):
+    """Tempo (BPM) from the autocorrelation peak of an onset envelope"""
+    n_frames = onset.shape[0]
+    min_lag = max(1, int(60.0 / (TEMPO_MAX_BPM * frame_seconds)))
+    max_lag = min(n_frames - 1, int(60.0 / (TEMPO_MIN_BPM * frame_seconds)))
+    if max_lag <= min_lag:
+        return 0.0
+    
+    # Light smoothing so periods that fall between frames still line up
+    smoothed = onset.copy()
+    for i in range(1, n_frames - 1):
+        smoothed[i] = (onset[i - 1] + onset[i] + onset[i + 1]) / 3.0
+    onset_mean = smoothed.mean()
+    
+    best_corr = 0.0
+    best_lag = 0
+    for lag in range(min_lag, max_lag + 1):
+        corr = 0.0
+        for i in range(n_frames - lag):
+            corr += (smoothed[i] - onset_mean) * (smoothed[i + lag] - onset_mean)
+        if corr > best_corr:
+            best_corr = corr
+            best_lag = lag
+    
+    return 60.0 / (best_lag * frame_seconds) if best_lag > 0 else 0.0
+
+
+def _get_voice_kernel():
+    """Lazy load the voice feature kernels (numba-compiled when available)"""
+    global _voice_kernel
+    if _voice_kernel is None:
         try:
-            import librosa
-            _librosa = librosa
+            import scipy.fft  # noqa: F401 - required for the STFT
+            try:
+                import numba
+                jit = numba.njit(cache=True, fastmath=True)
+                _voice_kernel = (jit(_voice_frame_features), jit(_onset_tempo))
+            except ImportError:
+                _voice_kernel = (_voice_frame_features, _onset_tempo)
         except Exception as e:
-            print(f"❌ Failed to load librosa: {e}")
-            _librosa = False
-    return _librosa if _librosa is not False else None
+            print(f"❌ Failed to load voice analysis backend: {e}")
+            _voice_kernel = False
+    return _voice_kernel if _voice_kernel is not False else None
+
+
+class _VoiceFeatureStream:
+    """
+    Incremental voice feature extraction over audio blocks
+    
+    Blocks are mixed to mono, resampled to ANALYSIS_SAMPLE_RATE and framed
+    into a centered STFT as they arrive. Only per-frame scalars are kept
+    (peak pitch, RMS, onset), so memory does not grow with the sample count.
+    """
+    
+    def __init__(self, sample_rate: int, kernel):
+        from scipy import fft, signal
+        
+        self._fft = fft
+        self._frame_kernel, self._tempo_kernel = kernel
+        self.sample_rate = int(sample_rate)
+        self._resampler = None
+        if self.sample_rate != ANALYSIS_SAMPLE_RATE:
+            try:
+                import soxr
+                self._resampler = soxr.ResampleStream(
+                    self.sample_rate, ANALYSIS_SAMPLE_RATE, 1, dtype='float32', quality="QQ"
+                )
+            except ImportError:
+                self._resampler = None
+        
+        self.window = signal.get_window("hann", STFT_FRAME).astype(np.float32)
+        self.window_sum = float(self.window.sum())
+        self.freqs = fft.rfftfreq(STFT_FRAME, d=1.0 / ANALYSIS_SAMPLE_RATE)
+        
+        # One-sided spectrum: every bin but DC/Nyquist stands for two
+        self.power_weights = np.full(len(self.freqs), 2.0)
+        self.power_weights[0] = 1.0
+        self.power_weights[-1] = 1.0
+        # Undo the 1/sum(window) scaling and the window's energy loss
+        self.power_scale = self.window_sum ** 2 / (STFT_FRAME ** 2 * float(np.mean(self.window ** 2)))
+        
+        # Centered frames: start with half a frame of zeros, as scipy.signal.stft pads
+        self._pending = np.zeros(STFT_FRAME // 2, dtype=np.float32)
+        self._prev = np.zeros(len(self.freqs))
+        self._peak_freqs: List[np.ndarray] = []
+        self._peak_mags: List[np.ndarray] = []
+        self._frame_rms: List[np.ndarray] = []
+        self._onset: List[np.ndarray] = []
+        self._max_mag = 0.0
+        self._first_frame = True
+    
+    def feed(self, block: np.ndarray, last: bool = False):
+        """Add a block of samples (any channel count) at the input sample rate"""
+        block = self._resample(self._to_mono(block), last)
+        self._pending = np.concatenate((self._pending, block))
+        if last:
+            self._pending = np.concatenate(
+                (self._pending, np.zeros(STFT_FRAME // 2, dtype=np.float32))
+            )
+        self._process_frames()
+    
+    def finish(self) -> Tuple[float, float, float, float]:
+        """Return (pitch_mean, pitch_variance, intensity, tempo)"""
+        if not self._frame_rms:
+            return 0.0, 0.0, 0.0, 0.0
+        
+        peak_freqs = np.concatenate(self._peak_freqs)
+        peak_mags = np.concatenate(self._peak_mags)
+        frame_rms = np.concatenate(self._frame_rms)
+        onset = np.concatenate(self._onset)
+        
+        voiced = peak_freqs[(peak_freqs > 0) & (peak_mags > PITCH_THRESHOLD * self._max_mag)]
+        pitch_mean = float(voiced.mean()) if len(voiced) else 0.0
+        pitch_variance = float(voiced.var()) if len(voiced) else 0.0
+        intensity = float(frame_rms.mean())
+        tempo = float(self._tempo_kernel(onset, STFT_HOP / ANALYSIS_SAMPLE_RATE))
+        
+        return pitch_mean, pitch_variance, intensity, tempo
+    
+    def _to_mono(self, block: np.ndarray) -> np.ndarray:
+        if block.ndim > 1:
+            block = block.mean(axis=1, dtype=np.float32)
+        return np.ascontiguousarray(block, dtype=np.float32)
+    
+    def _resample(self, block: np.ndarray, last: bool) -> np.ndarray:
+        if self.sample_rate == ANALYSIS_SAMPLE_RATE:
+            return block
+        if self._resampler is not None:
+            return self._resampler.resample_chunk(block, last=last)
+        
+        # scipy fallback resamples each block independently
+        from math import gcd
+        from scipy import signal
+        g = gcd(self.sample_rate, ANALYSIS_SAMPLE_RATE)
+        resampled = signal.resample_poly(block, ANALYSIS_SAMPLE_RATE // g, self.sample_rate // g)
+        return resampled.astype(np.float32)
+    
+    def _process_frames(self):
+        n_frames = 0 if len(self._pending) < STFT_FRAME else 1 + (len(self._pending) - STFT_FRAME) // STFT_HOP
+        if n_frames == 0:
+            return
+        
+        frames = np.lib.stride_tricks.sliding_window_view(self._pending, STFT_FRAME)[::STFT_HOP][:n_frames]
+        
+        # float32 rfft over the block's frames at once, laid out (frames, bins)
+        S = np.abs(self._fft.rfft(frames * self.window, axis=1, workers=-1)) / self.window_sum
+        if self._first_frame:
+            self._prev[:] = S[0]  # First frame has no onset
+            self._first_frame = False
+        self._max_mag = max(self._max_mag, float(S.max()))
+        
+        peak_freqs = np.empty(n_frames)
+        peak_mags = np.empty(n_frames)
+        frame_rms = np.empty(n_frames)
+        onset = np.empty(n_frames)
+        self._frame_kernel(
+            S, self._prev, self.freqs, self.power_weights, self.power_scale,
+            peak_freqs, peak_mags, frame_rms, onset
+        )
+        self._peak_freqs.append(peak_freqs)
+        self._peak_mags.append(peak_mags)
+        self._frame_rms.append(frame_rms)
+        self._onset.append(onset)
+        
+        # Keep the samples the next frame still needs
+        self._pending = self._pending[n_frames * STFT_HOP:].copy()
+
+
+def _voice_emotion_rules(pitch_mean: float, pitch_variance: float,
+                         intensity: float, tempo: float) -> str:
+    """
+    Rule cascade mapping voice features to an emotion
+    
+    High pitch + high intensity = excited/angry
+    Low pitch + low intensity = sad
+    High variance = emotional/excited
+    Low variance + moderate = calm/confident
+    """
+    if intensity < 0.3:
+        return "sad"
+    
+    if pitch_mean > 200 and intensity > 0.6:
+        if pitch_variance > 1000:
+            return "angry"
+        return "excited"
+    
+    if pitch_mean < 150 and intensity < 0.5:
+        return "sad"
+    
+    if pitch_variance > 2000 and intensity > 0.7:
+        return "frustrated"
+    
+    if intensity > 0.5 and tempo > 120:
+        return "excited"
+    
+    if pitch_variance < 500 and intensity > 0.4:
+        return "confident"
+    
+    return "neutral"
+
+
+def _build_voice_emotion_lut() -> Tuple[str, ...]:
+    """
+    Evaluate the rule cascade once per feature-bucket combination
+    
+    Key layout: pitch (2 bits) | variance (2 bits) | intensity (3 bits) | tempo (1 bit).
+    Representative values sit strictly inside each bucket.
+    """
+    pitch_values = (100.0, 175.0, 250.0)
+    variance_values = (0.0, 750.0, 1500.0, 3000.0)
+    intensity_values = (0.1, 0.35, 0.45, 0.5, 0.55, 0.65, 0.8)
+    tempo_values = (100.0, 150.0)
+    
+    lut = ["neutral"] * 256
+    for p, pitch in enumerate(pitch_values):
+        for v, variance in enumerate(variance_values):
+            for i, intensity in enumerate(intensity_values):
+                for t, tempo in enumerate(tempo_values):
+                    key = (p << 6) | (v << 4) | (i << 1) | t
+                    lut[key] = _voice_emotion_rules(pitch, variance, intensity, tempo)
+    return tuple(lut)
+
+
+_VOICE_EMOTION_LUT = _build_voice_emotion_lut()
 
 
 class EmotionDetector:
@@ -93,10 +572,8 @@ class EmotionDetector:
             if pipeline is None:
                 return self._default_emotion()
             
-            # Get sentiment from model
-            result = pipeline(text[:512])[0]  # Limit text length
-            sentiment = result['label']  # POSITIVE or NEGATIVE
-            confidence = result['score']
+            # Get sentiment from model (cached, and batched with concurrent callers)
+            sentiment, confidence = _classify_sentiment_cached(_sentiment_cache_key(pipeline, text))
             
             # Map to emotion based on sentiment and confidence
             emotion = self._map_sentiment_to_emotion(sentiment, confidence, text)
@@ -113,45 +590,44 @@ class EmotionDetector:
             print(f"❌ Text emotion analysis error: {e}")
             return self._default_emotion()
     
-    def analyze_voice(self, audio_data: bytes, sample_rate: int = 16000) -> Dict[str, any]:
+    def analyze_voice(self, audio_data: bytes, sample_rate: int = 16000,
+                      cancel_event: Optional[threading.Event] = None,
+                      raw_pcm: bool = False) -> Dict[str, any]:
         """
         Analyze voice audio for emotional cues (pitch, intensity, tempo)
         
         Args:
-            audio_data: Raw audio bytes
-            sample_rate: Audio sample rate
+            audio_data: Audio file bytes (WAV, FLAC, OGG, ...) or raw mono PCM16
+            sample_rate: Sample rate of raw PCM16 input
+            cancel_event: Optional event that stops decoding early when set
+            raw_pcm: True if audio_data is headerless PCM16 rather than an audio file
             
         Returns:
             Dict with emotion, pitch, intensity, and description
         """
         try:
-            librosa = _get_librosa()
-            if librosa is None:
+            kernel = _get_voice_kernel()
+            if kernel is None:
                 return self._default_emotion()
             
-            import io
-            import soundfile as sf
-            
-            # Convert bytes to numpy array
-            audio_array, sr = sf.read(io.BytesIO(audio_data))
-            
-            # Extract audio features
-            pitch_features = self._extract_pitch(audio_array, sr, librosa)
-            intensity = self._extract_intensity(audio_array, librosa)
-            tempo = self._extract_tempo(audio_array, sr, librosa)
+            # Stream-decode and extract features block by block from a shared STFT
+            features = self._extract_all_features(audio_data, sample_rate, kernel, cancel_event, raw_pcm)
+            if features is None:
+                return self._default_emotion()
+            pitch_mean, pitch_variance, intensity, tempo = features
             
             # Infer emotion from audio features
             emotion = self._infer_emotion_from_voice(
-                pitch_features['mean'],
-                pitch_features['variance'],
+                pitch_mean,
+                pitch_variance,
                 intensity,
                 tempo
             )
             
             return {
                 "emotion": emotion,
-                "pitch_mean": round(pitch_features['mean'], 2),
-                "pitch_variance": round(pitch_features['variance'], 2),
+                "pitch_mean": round(pitch_mean, 2),
+                "pitch_variance": round(pitch_variance, 2),
                 "intensity": round(intensity, 2),
                 "tempo": round(tempo, 2),
                 "description": self.EMOTION_DESCRIPTIONS.get(emotion, "neutral"),
@@ -163,7 +639,7 @@ class EmotionDetector:
             return self._default_emotion()
     
     def analyze_combined(self, text: str, audio_data: Optional[bytes] = None, 
-                        sample_rate: int = 16000) -> Dict[str, any]:
+                        sample_rate: int = 16000, raw_pcm: bool = False) -> Dict[str, any]:
         """
         Combine text and voice analysis for more accurate emotion detection
         
@@ -171,14 +647,27 @@ class EmotionDetector:
             text: User's text message
             audio_data: Optional voice audio bytes
             sample_rate: Audio sample rate
+            raw_pcm: True if audio_data is headerless PCM16 rather than an audio file
             
         Returns:
             Dict with combined emotion analysis
         """
-        text_result = self.analyze_text(text)
-        
         if audio_data:
-            voice_result = self.analyze_voice(audio_data, sample_rate)
+            # Voice starts in the background while the text is classified here;
+            # the sentiment forward pass and the STFT both release the GIL
+            cancel_voice = threading.Event()
+            voice_future = _analysis_pool.submit(
+                self.analyze_voice, audio_data, sample_rate, cancel_voice, raw_pcm
+            )
+            text_result = self.analyze_text(text)
+            
+            # Confident text wins the merge anyway, so stop the voice work
+            if text_result['confidence'] >= TEXT_CONFIDENCE_SATURATION:
+                cancel_voice.set()
+                voice_future.cancel()
+                return {**text_result, "source": "text"}
+            
+            voice_result = voice_future.result()
             
             # Combine results (prioritize voice if confidence is high)
             if voice_result.get('intensity', 0) > 0.6:
@@ -198,18 +687,18 @@ class EmotionDetector:
                 "source": source
             }
         
-        return text_result
+        return self.analyze_text(text)
     
     def _map_sentiment_to_emotion(self, sentiment: str, confidence: float, text: str) -> str:
         """Map sentiment to specific emotion based on confidence and keywords"""
-        text_lower = text.lower()
+        matches = _match_emotion_keywords(text.lower()) if confidence > 0.85 else set()
         
         if sentiment == "POSITIVE":
             # High confidence positive emotions
             if confidence > 0.85:
-                if any(word in text_lower for word in ["thanks", "thank you", "grateful", "appreciate"]):
+                if "grateful" in matches:
                     return "grateful"
-                if any(word in text_lower for word in ["!", "amazing", "awesome", "great", "excellent"]):
+                if "excited" in matches:
                     return "excited"
                 return "happy"
             elif confidence > 0.65:
@@ -220,11 +709,11 @@ class EmotionDetector:
         elif sentiment == "NEGATIVE":
             # High confidence negative emotions
             if confidence > 0.85:
-                if any(word in text_lower for word in ["angry", "mad", "furious", "hate"]):
+                if "angry" in matches:
                     return "angry"
-                if any(word in text_lower for word in ["worried", "anxious", "scared", "afraid", "nervous"]):
+                if "worried" in matches:
                     return "worried"
-                if any(word in text_lower for word in ["frustrated", "annoyed", "irritated"]):
+                if "frustrated" in matches:
                     return "frustrated"
                 return "sad"
             elif confidence > 0.65:
@@ -234,79 +723,71 @@ class EmotionDetector:
         
         return "neutral"
     
-    def _extract_pitch(self, audio: np.ndarray, sr: int, librosa) -> Dict[str, float]:
-        """Extract pitch features from audio"""
-        try:
-            # Use librosa to extract pitch
-            pitches, magnitudes = librosa.piptrack(y=audio, sr=sr)
-            
-            # Get mean pitch (filter out zeros)
-            pitch_values = pitches[pitches > 0]
-            if len(pitch_values) > 0:
-                pitch_mean = float(np.mean(pitch_values))
-                pitch_variance = float(np.var(pitch_values))
-            else:
-                pitch_mean = 0.0
-                pitch_variance = 0.0
+    def _extract_all_features(self, audio_data: bytes, sample_rate: int, kernel,
+                              cancel_event: Optional[threading.Event] = None,
+                              raw_pcm: bool = False
+                              ) -> Optional[Tuple[float, float, float, float]]:
+        """
+        Extract (pitch_mean, pitch_variance, intensity, tempo) while decoding in blocks
+        
+        Args:
+            audio_data: Encoded audio file, or raw mono 16-bit PCM
+            sample_rate: Sample rate of raw PCM (encoded files carry their own)
+            kernel: Voice feature kernels from _get_voice_kernel
+            cancel_event: Checked between blocks; returns None once set
+            raw_pcm: Decode as headerless PCM16 instead of through soundfile
+        """
+        if raw_pcm:
+            if not audio_data or len(audio_data) % 2:
+                return None
+            # Zero-copy view of the PCM buffer; only one block at a time is converted
+            samples = np.frombuffer(audio_data, dtype="<i2")
+            stream = _VoiceFeatureStream(sample_rate, kernel)
+            for start in range(0, len(samples), AUDIO_BLOCK_SIZE):
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                block = samples[start:start + AUDIO_BLOCK_SIZE].astype(np.float32)
+                block *= 1.0 / 32768.0
+                stream.feed(block)
+        else:
+            import io
+            import soundfile as sf
             
-            return {
-                "mean": pitch_mean,
-                "variance": pitch_variance
-            }
-        except Exception as e:
-            print(f"⚠️ Pitch extraction error: {e}")
-            return {"mean": 0.0, "variance": 0.0}
-    
-    def _extract_intensity(self, audio: np.ndarray, librosa) -> float:
-        """Extract intensity (RMS energy) from audio"""
-        try:
-            rms = librosa.feature.rms(y=audio)
-            intensity = float(np.mean(rms))
-            return intensity
-        except Exception as e:
-            print(f"⚠️ Intensity extraction error: {e}")
-            return 0.0
+            with sf.SoundFile(io.BytesIO(audio_data)) as audio_file:
+                stream = _VoiceFeatureStream(audio_file.samplerate, kernel)
+                for block in audio_file.blocks(blocksize=AUDIO_BLOCK_SIZE, dtype='float32'):
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    stream.feed(block)
+        stream.feed(np.zeros(0, dtype=np.float32), last=True)
+        
+        return stream.finish()
     
-    def _extract_tempo(self, audio: np.ndarray, sr: int, librosa) -> float:
-        """Extract tempo from audio"""
-        try:
-            tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
-            return float(tempo)
-        except Exception as e:
-            print(f"⚠️ Tempo extraction error: {e}")
-            return 0.0
+    @staticmethod
+    def is_raw_pcm_content_type(content_type: Optional[str]) -> bool:
+        """True if an upload's content type declares headerless PCM16 (e.g. "audio/L16; rate=16000")"""
+        if not content_type:
+            return False
+        return content_type.split(";", 1)[0].strip().lower() in RAW_PCM_CONTENT_TYPES
     
     def _infer_emotion_from_voice(self, pitch_mean: float, pitch_variance: float,
                                   intensity: float, tempo: float) -> str:
         """
-        Infer emotion from voice features
+        Infer emotion from voice features via the precomputed bucket table
         
-        High pitch + high intensity = excited/angry
-        Low pitch + low intensity = sad
-        High variance = emotional/excited
-        Low variance + moderate = calm/confident
+        Each feature is bucketed at the thresholds used by _voice_emotion_rules,
+        so the lookup returns exactly what the rule cascade would.
         """
-        if intensity < 0.3:
-            return "sad"
-        
-        if pitch_mean > 200 and intensity > 0.6:
-            if pitch_variance > 1000:
-                return "angry"
-            return "excited"
-        
-        if pitch_mean < 150 and intensity < 0.5:
-            return "sad"
+        pitch_bucket = (pitch_mean >= 150) + (pitch_mean > 200)
+        variance_bucket = (pitch_variance >= 500) + (pitch_variance > 1000) + (pitch_variance > 2000)
+        intensity_bucket = (
+            (intensity >= 0.3) + (intensity > 0.4) + (intensity >= 0.5)
+            + (intensity > 0.5) + (intensity > 0.6) + (intensity > 0.7)
+        )
+        tempo_bucket = tempo > 120
         
-        if pitch_variance > 2000 and intensity > 0.7:
-            return "frustrated"
-        
-        if intensity > 0.5 and tempo > 120:
-            return "excited"
-        
-        if pitch_variance < 500 and intensity > 0.4:
-            return "confident"
-        
-        return "neutral"
+        key = (pitch_bucket << 6) | (variance_bucket << 4) | (intensity_bucket << 1) | tempo_bucket
+        return _VOICE_EMOTION_LUT[key]
     
     def _default_emotion(self) -> Dict[str, any]:
         """Return default neutral emotion"""
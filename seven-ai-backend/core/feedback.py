@@ -3,8 +3,11 @@ Feedback and Continuous Learning Module
 Tracks user corrections and ratings to improve Seven's responses
 """
 
+import hashlib
 import sqlite3
 import os
+import re
+import threading
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
@@ -15,6 +18,52 @@ class FeedbackManager:
     Manages user feedback, corrections, and continuous learning
     """
     
+    # Statements reused on every call (kept identical so SQLite's statement cache hits)
+    INSERT_FEEDBACK_SQL = """
+        INSERT INTO feedback (
+            user_id, message_id, feedback_type, rating, correction,
+            user_message, assistant_response, context, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    UPSERT_CORRECTION_SQL = """
+        INSERT INTO learning_insights (
+            user_id, insight_type, pattern, correction, last_seen, pattern_key
+        ) VALUES (?, 'correction', ?, ?, ?, ?)
+        ON CONFLICT(user_id, insight_type, pattern_key) DO UPDATE SET
+            frequency = frequency + 1,
+            last_seen = excluded.last_seen,
+            correction = excluded.correction
+    """
+    CORRECTION_FREQUENCY_SQL = """
+        SELECT frequency FROM learning_insights
+        WHERE user_id = ? AND insight_type = 'correction' AND pattern_key = ?
+    """
+    UNAPPLIED_INSIGHTS_SQL = """
+        SELECT id, pattern, correction FROM learning_insights
+        WHERE user_id = ? AND applied_to_memory = 0 AND frequency >= 2
+        ORDER BY frequency DESC, last_seen DESC
+    """
+    FEEDBACK_SUMMARY_SQL = """
+        SELECT
+            COUNT(*) AS total,
+            SUM(CASE WHEN feedback_type = 'rating' AND rating = 1 THEN 1 ELSE 0 END) AS positive,
+            SUM(CASE WHEN feedback_type = 'rating' AND rating = -1 THEN 1 ELSE 0 END) AS negative,
+            SUM(CASE WHEN feedback_type = 'correction' THEN 1 ELSE 0 END) AS corrections,
+            (SELECT COUNT(*) FROM learning_insights WHERE user_id = ?) AS insights
+        FROM feedback
+        WHERE user_id = ?
+    """
+    MARK_APPLIED_SQL = """
+        UPDATE learning_insights
+        SET applied_to_memory = 1
+        WHERE id = ?
+    """
+    UNMARK_APPLIED_SQL = """
+        UPDATE learning_insights
+        SET applied_to_memory = 0
+        WHERE id = ?
+    """
+    
     def __init__(self, db_path: str = "./data/feedback.db"):
         """Initialize feedback database"""
         self.db_path = db_path
@@ -22,14 +71,38 @@ class FeedbackManager:
         # Create data directory if needed
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
+        # One long-lived connection, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        
         # Initialize database
         self._initialize_database()
         print("SUCCESS: Feedback system initialized")
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open the shared connection in WAL mode"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+    
     def _initialize_database(self):
         """Create feedback tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._lock, self._conn:
+            # Explicit BEGIN so the DDL below (which sqlite3 runs outside any implicit
+            # transaction) commits or rolls back together with the migration
+            self._conn.execute("BEGIN")
+            cursor = self._conn.cursor()
+            self._create_tables(cursor)
+            self._migrate_pattern_keys(cursor)
+            # Refresh planner statistics once per session so the indexes get used
+            self._conn.execute("ANALYZE")
+    
+    def _create_tables(self, cursor: sqlite3.Cursor):
+        """Create feedback tables if they don't exist"""
         
         # Feedback table for ratings and corrections
         cursor.execute("""
@@ -57,12 +130,77 @@ class FeedbackManager:
                 correction TEXT,
                 frequency INTEGER DEFAULT 1,
                 last_seen TEXT NOT NULL,
-                applied_to_memory INTEGER DEFAULT 0
+                applied_to_memory INTEGER DEFAULT 0,
+                pattern_key INTEGER
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Newest-first reads per user (get_feedback, summary counts)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_feedback_user_type_time
+            ON feedback(user_id, feedback_type, created_at DESC)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_insights_user_freq
+            ON learning_insights(user_id, frequency DESC, last_seen DESC)
+        """)
+    
+    @staticmethod
+    def _pattern_key(user_message: Optional[str]) -> int:
+        """Stable 63-bit key for a message, ignoring case and whitespace differences"""
+        normalized = re.sub(r"\s+", " ", (user_message or "").lower().strip())[:80]
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") & 0x7FFFFFFFFFFFFFFF
+    
+    def _migrate_pattern_keys(self, cursor: sqlite3.Cursor):
+        """Add and backfill learning_insights.pattern_key, then index it for UPSERTs"""
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(learning_insights)")}
+        if "pattern_key" not in columns:
+            cursor.execute("ALTER TABLE learning_insights ADD COLUMN pattern_key INTEGER")
+        
+        # Older rows get a key; the most frequent of any duplicates keeps it and
+        # absorbs the others' counts, and the duplicates are deleted
+        rows = cursor.execute("""
+            SELECT id, user_id, insight_type, pattern, frequency, last_seen FROM learning_insights
+            WHERE pattern_key IS NULL
+            ORDER BY frequency DESC, last_seen DESC
+        """).fetchall()
+        owners = {
+            (row[0], row[1], row[2]): row[3] for row in cursor.execute("""
+                SELECT user_id, insight_type, pattern_key, id FROM learning_insights
+                WHERE pattern_key IS NOT NULL
+            """)
+        }
+        updates = []
+        merges = []
+        duplicates = []
+        for row in rows:
+            slot = (row["user_id"], row["insight_type"], self._pattern_key(row["pattern"]))
+            if slot in owners:
+                merges.append((row["frequency"] or 1, row["last_seen"], owners[slot]))
+                duplicates.append((row["id"],))
+            else:
+                owners[slot] = row["id"]
+                updates.append((slot[2], row["id"]))
+        cursor.executemany("UPDATE learning_insights SET pattern_key = ? WHERE id = ?", updates)
+        cursor.executemany("""
+            UPDATE learning_insights
+            SET frequency = frequency + ?, last_seen = MAX(last_seen, ?)
+            WHERE id = ?
+        """, merges)
+        cursor.executemany("DELETE FROM learning_insights WHERE id = ?", duplicates)
+        
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_insights_user_key
+            ON learning_insights(user_id, insight_type, pattern_key)
+        """)
+        
+        # The pattern_key probe replaces the earlier FTS5 pattern index
+        # (separate statements: executescript would COMMIT mid-migration)
+        cursor.execute("DROP TRIGGER IF EXISTS learning_insights_ai")
+        cursor.execute("DROP TRIGGER IF EXISTS learning_insights_ad")
+        cursor.execute("DROP TRIGGER IF EXISTS learning_insights_au")
+        cursor.execute("DROP TABLE IF EXISTS learning_insights_fts")
     
     def add_feedback(
         self,
@@ -91,29 +229,19 @@ class FeedbackManager:
         Returns:
             Feedback record
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO feedback (
-                user_id, message_id, feedback_type, rating, correction,
-                user_message, assistant_response, context, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            user_id,
-            message_id,
-            feedback_type,
-            rating,
-            correction,
-            user_message,
-            assistant_response,
-            json.dumps(context) if context else None,
-            datetime.now().isoformat()
-        ))
-        
-        feedback_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(self.INSERT_FEEDBACK_SQL, (
+                user_id,
+                message_id,
+                feedback_type,
+                rating,
+                correction,
+                user_message,
+                assistant_response,
+                json.dumps(context) if context else None,
+                datetime.now().isoformat()
+            ))
+            feedback_id = cursor.lastrowid
         
         # Process feedback for learning
         if feedback_type == 'correction' and correction:
@@ -140,45 +268,25 @@ class FeedbackManager:
         """
         Process correction and extract learning insights
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        pattern_key = self._pattern_key(user_message)
         
-        # Check if similar pattern exists
-        cursor.execute("""
-            SELECT id, frequency FROM learning_insights
-            WHERE user_id = ? AND insight_type = 'correction'
-            AND pattern LIKE ?
-        """, (user_id, f"%{user_message[:50]}%"))
-        
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update frequency
-            cursor.execute("""
-                UPDATE learning_insights
-                SET frequency = frequency + 1,
-                    last_seen = ?,
-                    correction = ?
-                WHERE id = ?
-            """, (datetime.now().isoformat(), correction, existing[0]))
-            print(f"LEARNING: Updated correction pattern (frequency: {existing[1] + 1})")
-        else:
-            # Create new insight
-            cursor.execute("""
-                INSERT INTO learning_insights (
-                    user_id, insight_type, pattern, correction, last_seen
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
+        with self._lock, self._conn:
+            # Insert the pattern, or bump its frequency if this user has seen it before
+            self._conn.execute(self.UPSERT_CORRECTION_SQL, (
                 user_id,
-                'correction',
                 user_message,
                 correction,
-                datetime.now().isoformat()
+                datetime.now().isoformat(),
+                pattern_key
             ))
-            print("LEARNING: New correction pattern identified")
+            frequency = self._conn.execute(
+                self.CORRECTION_FREQUENCY_SQL, (user_id, pattern_key)
+            ).fetchone()[0]
         
-        conn.commit()
-        conn.close()
+        if frequency > 1:
+            print(f"LEARNING: Updated correction pattern (frequency: {frequency})")
+        else:
+            print("LEARNING: New correction pattern identified")
     
     def get_feedback(
         self,
@@ -187,10 +295,6 @@ class FeedbackManager:
         limit: int = 50
     ) -> List[Dict]:
         """Get feedback records"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         query = "SELECT * FROM feedback WHERE 1=1"
         params = []
         
@@ -205,9 +309,8 @@ class FeedbackManager:
         query += " ORDER BY created_at DESC LIMIT ?"
         params.append(limit)
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
         
         return [dict(row) for row in rows]
     
@@ -226,61 +329,32 @@ class FeedbackManager:
         Returns:
             List of learning insights
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM learning_insights
-            WHERE user_id = ? AND frequency >= ?
-            ORDER BY frequency DESC, last_seen DESC
-        """, (user_id, min_frequency))
-        
-        rows = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT * FROM learning_insights
+                WHERE user_id = ? AND frequency >= ?
+                ORDER BY frequency DESC, last_seen DESC
+            """, (user_id, min_frequency)).fetchall()
         
         return [dict(row) for row in rows]
     
     def get_feedback_summary(self, user_id: str) -> Dict:
         """Get feedback summary for user"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Total feedback count
-        cursor.execute("""
-            SELECT COUNT(*) FROM feedback WHERE user_id = ?
-        """, (user_id,))
-        total_feedback = cursor.fetchone()[0]
-        
-        # Ratings breakdown
-        cursor.execute("""
-            SELECT rating, COUNT(*) FROM feedback
-            WHERE user_id = ? AND feedback_type = 'rating'
-            GROUP BY rating
-        """, (user_id,))
-        ratings = dict(cursor.fetchall())
-        
-        # Corrections count
-        cursor.execute("""
-            SELECT COUNT(*) FROM feedback
-            WHERE user_id = ? AND feedback_type = 'correction'
-        """, (user_id,))
-        corrections_count = cursor.fetchone()[0]
-        
-        # Learning insights count
-        cursor.execute("""
-            SELECT COUNT(*) FROM learning_insights WHERE user_id = ?
-        """, (user_id,))
-        insights_count = cursor.fetchone()[0]
-        
-        conn.close()
+        with self._lock:
+            return self._feedback_summary(self._conn.cursor(), user_id)
+    
+    def _feedback_summary(self, cursor: sqlite3.Cursor, user_id: str) -> Dict:
+        """Run the summary query on the given cursor"""
+        # All counters in one row: conditional aggregation plus an insights subselect
+        cursor.execute(self.FEEDBACK_SUMMARY_SQL, (user_id, user_id))
+        row = cursor.fetchone()
         
         return {
-            "total_feedback": total_feedback,
-            "positive_ratings": ratings.get(1, 0),
-            "negative_ratings": ratings.get(-1, 0),
-            "corrections": corrections_count,
-            "learning_insights": insights_count
+            "total_feedback": row["total"],
+            "positive_ratings": row["positive"] or 0,
+            "negative_ratings": row["negative"] or 0,
+            "corrections": row["corrections"] or 0,
+            "learning_insights": row["insights"]
         }
     
     def apply_insights_to_memory(self, user_id: str, memory_manager) -> int:
@@ -294,38 +368,34 @@ class FeedbackManager:
         Returns:
             Number of insights applied
         """
-        insights = self.get_learning_insights(user_id, min_frequency=2)
-        applied_count = 0
-        
-        for insight in insights:
-            if insight['applied_to_memory']:
-                continue
-            
-            # Add correction as a memory fact
-            fact = f"correction_learned: {insight['pattern'][:100]} -> {insight['correction'][:100]}"
-            
-            # Store in memory
-            memory_manager.add_memory(
-                user_id=user_id,
-                message="System: Learning from feedback",
-                response=f"Learned: {insight['correction']}"
+        # Claim the insights (select and mark applied in one locked transaction)
+        # so concurrent calls never add the same facts twice
+        with self._lock, self._conn:
+            insights = self._conn.execute(self.UNAPPLIED_INSIGHTS_SQL, (user_id,)).fetchall()
+            self._conn.executemany(
+                self.MARK_APPLIED_SQL, [(insight['id'],) for insight in insights]
             )
-            
-            # Mark as applied
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE learning_insights
-                SET applied_to_memory = 1
-                WHERE id = ?
-            """, (insight['id'],))
-            conn.commit()
-            conn.close()
-            
-            applied_count += 1
-            print(f"LEARNING: Applied insight #{insight['id']} to memory")
         
-        return applied_count
+        if not insights:
+            return 0
+        
+        # Add corrections as memory facts in one batch
+        facts = [
+            f"correction_learned: {(insight['pattern'] or '')[:100]} -> {(insight['correction'] or '')[:100]}"
+            for insight in insights
+        ]
+        try:
+            memory_manager.add_memories(user_id, facts)
+        except Exception:
+            # Release the claim so a later call can retry
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    self.UNMARK_APPLIED_SQL, [(insight['id'],) for insight in insights]
+                )
+            raise
+        
+        print(f"LEARNING: Applied {len(insights)} insights to memory")
+        return len(insights)
     
     def get_correction_context(self, user_id: str) -> str:
         """
@@ -5,11 +5,14 @@ Uses FAISS for vector similarity search and local JSON storage
 
 import os
 import json
+import importlib.util
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import hashlib
 
+from core.embedding_singleton import get_embedder, EMBEDDING_MODEL_NAME
+
 # Try to import FAISS and sentence transformers
 try:
     import faiss
@@ -18,13 +21,19 @@ except ImportError:
     FAISS_AVAILABLE = False
     print("WARNING: FAISS not available - knowledge base disabled")
 
-try:
-    from sentence_transformers import SentenceTransformer
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# sentence-transformers (and torch) are only imported when the model is first needed
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not TRANSFORMERS_AVAILABLE:
     print("WARNING: sentence-transformers not available - knowledge base disabled")
 
+# HNSW graph parameters: neighbors per node, and candidate list sizes for build/search
+HNSW_M = int(os.getenv("KNOWLEDGE_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("KNOWLEDGE_HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("KNOWLEDGE_HNSW_EF_SEARCH", "64"))
+
+# Adds between index/embedding snapshots (entries themselves are appended immediately)
+INDEX_SAVE_INTERVAL = int(os.getenv("KNOWLEDGE_INDEX_SAVE_INTERVAL", "16"))
+
 
 class KnowledgeBase:
     """
@@ -35,68 +44,266 @@ class KnowledgeBase:
     def __init__(self, data_dir: str = "./data"):
         """Initialize knowledge base"""
         self.data_dir = data_dir
-        self.knowledge_file = os.path.join(data_dir, "knowledge.json")
+        self.knowledge_file = os.path.join(data_dir, "knowledge.jsonl")
+        self.legacy_knowledge_file = os.path.join(data_dir, "knowledge.json")
         self.index_file = os.path.join(data_dir, "knowledge.index")
+        self.embeddings_file = os.path.join(data_dir, "knowledge_embeddings.npy")
         
-        self.model = None
+        self._model_name = EMBEDDING_MODEL_NAME
+        self.model = None  # Loaded on first encode
         self.index = None
+        self._reindex_pending = False
         self.knowledge_entries = []
+        self._by_id: Dict[str, int] = {}  # entry id -> position in knowledge_entries
+        self._by_faiss_id: Dict[int, int] = {}  # FAISS vector id -> position in knowledge_entries
+        self._legacy_ids: Dict[str, str] = {}  # current-scheme id -> stored MD5-era id
+        self._next_faiss_id = 0
+        self._embeddings: Optional[np.ndarray] = None  # float32 rows aligned with knowledge_entries
+        self._embedding_buffer: Optional[np.ndarray] = None  # Spare capacity behind _embeddings
+        self._unsaved_adds = 0
         self.dimension = 384  # Dimension for all-MiniLM-L6-v2
+        self.encode_batch_size = 64
         
         # Create data directory if it doesn't exist
         os.makedirs(data_dir, exist_ok=True)
         
-        # Initialize model and index
+        # Initialize index (the embedding model is loaded on first use)
         if TRANSFORMERS_AVAILABLE and FAISS_AVAILABLE:
             try:
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
                 self._load_or_create_index()
                 print("SUCCESS: Knowledge base initialized with FAISS")
             except Exception as e:
                 print(f"WARNING: Failed to initialize knowledge base: {e}")
-                self.model = None
+                self.index = None
         else:
             print("WARNING: Knowledge base requires FAISS and sentence-transformers")
     
     def is_available(self) -> bool:
         """Check if knowledge base is available"""
-        return self.model is not None and self.index is not None
+        return self.index is not None
+    
+    def _ensure_model(self):
+        """Fetch the shared embedding model the first time something needs encoding"""
+        if self.model is None:
+            self.model = get_embedder()
+            if self.model is None:
+                self.index = None
+                raise Exception("Knowledge base not available")
+        return self.model
+    
+    def _ensure_index(self):
+        """Finish a rebuild deferred at startup because it needed the model"""
+        if self._reindex_pending:
+            self._reindex_pending = False
+            self._reindex_all()
     
     def _load_or_create_index(self):
         """Load existing FAISS index or create new one"""
         # Load knowledge entries
         if os.path.exists(self.knowledge_file):
-            with open(self.knowledge_file, 'r', encoding='utf-8') as f:
-                self.knowledge_entries = json.load(f)
+            self.knowledge_entries, skipped = self._read_knowledge_lines()
+            if skipped:
+                # Rewrite so later appends don't land on the end of a broken line
+                self._save_knowledge()
             print(f"LOADED: {len(self.knowledge_entries)} knowledge entries")
+        elif os.path.exists(self.legacy_knowledge_file):
+            # Convert the old single-document JSON file to JSON Lines
+            with open(self.legacy_knowledge_file, 'r', encoding='utf-8') as f:
+                self.knowledge_entries = json.load(f)
+            self._save_knowledge()
+            print(f"MIGRATED: {len(self.knowledge_entries)} knowledge entries to JSONL")
         else:
             self.knowledge_entries = []
             self._save_knowledge()
+        self._assign_faiss_ids()
+        self._rebuild_id_lookup()
+        self._map_legacy_ids()
+        self._load_embeddings()
         
         # Load or create FAISS index
         if os.path.exists(self.index_file) and len(self.knowledge_entries) > 0:
             try:
-                self.index = faiss.read_index(self.index_file)
-                print(f"LOADED: FAISS index with {self.index.ntotal} vectors")
+                index = faiss.read_index(self.index_file)
             except Exception as e:
                 print(f"WARNING: Failed to load FAISS index: {e}")
                 self._create_new_index()
+                return
+            
+            if not self._is_current_index(index):
+                # Older layout, or a snapshot taken before the latest appends
+                print("REBUILDING: FAISS index is outdated")
+                self._create_new_index()
+                return
+            
+            self.index = index
+            self._set_ef_search(HNSW_EF_SEARCH)
+            self._align_embeddings()
+            print(f"LOADED: FAISS index with {self.index.ntotal} vectors")
         else:
             self._create_new_index()
     
+    def _is_current_index(self, index) -> bool:
+        """Check that a loaded index has the layout this version writes and matches the entries"""
+        if not isinstance(index, faiss.IndexIDMap2) or index.ntotal != len(self.knowledge_entries):
+            return False
+        base = faiss.downcast_index(index.index)
+        return isinstance(base, faiss.IndexHNSWSQ) and base.metric_type == faiss.METRIC_INNER_PRODUCT
+    
+    def _assign_faiss_ids(self):
+        """Give entries saved by older versions a FAISS vector id"""
+        self._next_faiss_id = max((e.get('faiss_id', -1) for e in self.knowledge_entries), default=-1) + 1
+        missing = [e for e in self.knowledge_entries if 'faiss_id' not in e]
+        for entry in missing:
+            entry['faiss_id'] = self._next_faiss_id
+            self._next_faiss_id += 1
+        if missing:
+            self._save_knowledge()
+    
+    def _map_legacy_ids(self):
+        """Entries saved with MD5 ids keep them; map their current id so dedup still finds them"""
+        self._legacy_ids = {}
+        for entry in self.knowledge_entries:
+            current_id = self._generate_id(entry['content'])
+            if current_id != entry['id']:
+                self._legacy_ids[current_id] = entry['id']
+    
+    def _load_embeddings(self):
+        """Memory-map the saved embedding matrix if it is consistent with the entries"""
+        self._embeddings = None
+        if not os.path.exists(self.embeddings_file):
+            return
+        
+        try:
+            embeddings = np.load(self.embeddings_file, mmap_mode='r')
+        except Exception as e:
+            print(f"WARNING: Failed to load embeddings: {e}")
+            return
+        
+        # Snapshots lag behind appended entries, so a shorter matrix is still a valid prefix
+        if (embeddings.ndim == 2 and embeddings.shape[1] == self.dimension
+                and len(embeddings) <= len(self.knowledge_entries) and embeddings.dtype == np.float32):
+            self._embeddings = embeddings
+        else:
+            print("WARNING: Saved embeddings don't match knowledge entries, will re-encode")
+    
+    def _align_embeddings(self):
+        """Make embedding row i belong to entry i again, taking missing rows from the index"""
+        if self._embeddings is not None and len(self._embeddings) == len(self.knowledge_entries):
+            return
+        # The .npy is missing or older than the index: the index holds every vector
+        # (8-bit codes decode to within quantization error, and re-encode to the same codes)
+        vectors = self.index.reconstruct_batch(self._faiss_ids(self.knowledge_entries))
+        self._embeddings = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._embedding_buffer = None
+        print(f"RESTORED: {len(self._embeddings)} embeddings from the FAISS index")
+    
+    def _save_embeddings(self):
+        """Write the embedding matrix to .npy (atomically, so a crash never leaves half a file)"""
+        if self._embeddings is None:
+            return
+        tmp_file = self.embeddings_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            np.save(f, np.ascontiguousarray(self._embeddings, dtype=np.float32))
+        os.replace(tmp_file, self.embeddings_file)
+    
+    def _set_ef_search(self, ef_search: int):
+        """Set the HNSW search breadth on the wrapped graph index"""
+        faiss.downcast_index(self.index.index).hnsw.efSearch = ef_search
+    
+    def _new_index(self):
+        """
+        Empty id-mapped HNSW index: graph search visits O(log N) vectors instead of all N
+        
+        Embeddings are unit length, so the inner product is the cosine similarity.
+        Vectors are stored as 8-bit scalar codes (1 byte per dimension instead of 4).
+        """
+        graph = faiss.IndexHNSWSQ(
+            self.dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+        # Unit vectors have every component in [-1, 1], so the quantizer range is fixed
+        # up front and never needs retraining as entries are added
+        bounds = np.vstack([-np.ones(self.dimension), np.ones(self.dimension)]).astype('float32')
+        graph.train(bounds)
+        graph.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        graph.hnsw.efSearch = HNSW_EF_SEARCH
+        # Vectors are addressed by each entry's faiss_id, not by list position
+        return faiss.IndexIDMap2(graph)
+    
     def _create_new_index(self):
         """Create new FAISS index"""
-        self.index = faiss.IndexFlatL2(self.dimension)
+        self.index = self._new_index()
         print("CREATED: New FAISS index")
         
-        # Re-index existing knowledge if any
+        # Re-index existing knowledge if any. Saved embeddings make this cheap;
+        # if entries would need encoding, wait until the model is needed anyway.
         if len(self.knowledge_entries) > 0:
-            self._reindex_all()
+            saved = 0 if self._embeddings is None else len(self._embeddings)
+            if saved == len(self.knowledge_entries):
+                self._reindex_all()
+            else:
+                self._reindex_pending = True
+    
+    def _rebuild_id_lookup(self):
+        """Recompute the id -> position maps after the entry list changes shape"""
+        self._by_id = {entry['id']: i for i, entry in enumerate(self.knowledge_entries)}
+        self._by_faiss_id = {entry['faiss_id']: i for i, entry in enumerate(self.knowledge_entries)}
+    
+    def _faiss_ids(self, entries: List[Dict]) -> np.ndarray:
+        """FAISS vector ids of the given entries"""
+        return np.array([entry['faiss_id'] for entry in entries], dtype='int64')
+    
+    def _remove_vectors(self, faiss_ids: np.ndarray):
+        """Drop vectors from the index without re-encoding anything"""
+        try:
+            self.index.remove_ids(faiss_ids)
+        except RuntimeError:
+            # HNSW graphs can't unlink nodes: rebuild the graph from the saved embeddings
+            keep = self._faiss_ids(self.knowledge_entries)
+            index = self._new_index()
+            if len(keep):
+                if self._embeddings is not None:
+                    vectors = np.ascontiguousarray(self._embeddings)
+                else:
+                    vectors = self.index.reconstruct_batch(keep)
+                index.add_with_ids(vectors, keep)
+            self.index = index
+    
+    def _read_knowledge_lines(self) -> Tuple[List[Dict], int]:
+        """Read entries from the JSON Lines file; returns (entries, unreadable line count)"""
+        entries = []
+        skipped = 0
+        with open(self.knowledge_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Typically a write cut short by a crash
+                    print(f"WARNING: Skipping unreadable knowledge line {line_number}")
+                    skipped += 1
+        return entries, skipped
     
     def _save_knowledge(self):
-        """Save knowledge entries to JSON"""
-        with open(self.knowledge_file, 'w', encoding='utf-8') as f:
-            json.dump(self.knowledge_entries, f, indent=2, ensure_ascii=False)
+        """Rewrite all knowledge entries as JSON Lines (needed after deletes)"""
+        tmp_file = self.knowledge_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in self.knowledge_entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_file, self.knowledge_file)
+    
+    def _append_knowledge(self, entries: List[Dict]):
+        """Append new entries to the JSON Lines file: O(new entries), not O(all entries)"""
+        with open(self.knowledge_file, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+    
+    def flush(self):
+        """Write the FAISS index and embedding matrix snapshots"""
+        if self.index is None:
+            return
+        self._save_index()
+        self._save_embeddings()
+        self._unsaved_adds = 0
     
     def _save_index(self):
         """Save FAISS index to file"""
@@ -105,25 +312,63 @@ class KnowledgeBase:
     
     def _reindex_all(self):
         """Re-index all knowledge entries"""
-        if not self.model or not self.knowledge_entries:
+        if not self.knowledge_entries:
             return
         
         # Create new index
-        self.index = faiss.IndexFlatL2(self.dimension)
+        self.index = self._new_index()
         
-        # Encode all entries
-        texts = [entry['content'] for entry in self.knowledge_entries]
-        embeddings = self.model.encode(texts)
+        # Reuse saved embeddings; only run the model for entries appended after the last snapshot
+        saved = 0 if self._embeddings is None else len(self._embeddings)
+        if saved < len(self.knowledge_entries):
+            texts = [entry['content'] for entry in self.knowledge_entries[saved:]]
+            missing = self._encode(texts)
+            self._append_embeddings(missing)
+            self._save_embeddings()
         
         # Add to index
-        self.index.add(np.array(embeddings).astype('float32'))
+        self.index.add_with_ids(self._embeddings, self._faiss_ids(self.knowledge_entries))
         self._save_index()
         
         print(f"REINDEXED: {len(self.knowledge_entries)} entries")
     
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in batches into a float32 (n, dimension) matrix"""
+        embeddings = self._ensure_model().encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        # encode() already returns a contiguous float32 matrix; this only copies if it did not
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def _append_embeddings(self, embeddings: np.ndarray):
+        """Append rows to the embedding matrix without copying it on every add"""
+        current = 0 if self._embeddings is None else len(self._embeddings)
+        needed = current + len(embeddings)
+        buffer = self._embedding_buffer
+        
+        # Grow geometrically; reallocate if _embeddings was replaced (load, delete, clear)
+        if (buffer is None or len(buffer) < needed
+                or (current and self._embeddings.base is not buffer)):
+            buffer = np.empty((max(needed, 2 * current, 64), self.dimension), dtype=np.float32)
+            if current:
+                buffer[:current] = self._embeddings
+            self._embedding_buffer = buffer
+        
+        buffer[current:needed] = embeddings
+        self._embeddings = buffer[:needed]
+    
     def _generate_id(self, content: str) -> str:
-        """Generate unique ID for knowledge entry"""
-        return hashlib.md5(content.encode()).hexdigest()[:16]
+        """Generate unique ID for knowledge entry (64-bit BLAKE2b, 16 hex chars)"""
+        return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+    
+    def _find_existing(self, entry_id: str) -> Optional[Dict]:
+        """Find an entry by generated id, including entries keyed by the older MD5 scheme"""
+        entry_id = self._legacy_ids.get(entry_id, entry_id)
+        position = self._by_id.get(entry_id)
+        return None if position is None else self.knowledge_entries[position]
     
     def add_knowledge(
         self, 
@@ -144,43 +389,80 @@ class KnowledgeBase:
         Returns:
             Dictionary with entry details
         """
-        if not self.is_available():
-            raise Exception("Knowledge base not available")
-        
-        # Generate ID
-        entry_id = self._generate_id(content)
-        
-        # Check if already exists
-        existing = next((e for e in self.knowledge_entries if e['id'] == entry_id), None)
-        if existing:
-            return {"status": "exists", "entry": existing}
-        
-        # Create embedding
-        embedding = self.model.encode([content])[0]
-        
-        # Create entry
-        entry = {
-            "id": entry_id,
-            "title": title or content[:50] + "...",
+        return self.add_knowledge_batch([{
             "content": content,
+            "title": title,
             "source": source,
-            "created_at": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        
-        # Add to knowledge base
-        self.knowledge_entries.append(entry)
+            "metadata": metadata
+        }])[0]
+    
+    def add_knowledge_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Add several knowledge entries with a single embedding pass
         
-        # Add embedding to FAISS index
-        self.index.add(np.array([embedding]).astype('float32'))
+        Args:
+            items: Dicts with 'content' and optional 'title', 'source', 'metadata'
+            
+        Returns:
+            One {"status", "entry"} dict per item, in input order
+        """
+        if not self.is_available():
+            raise Exception("Knowledge base not available")
+        self._ensure_index()
         
-        # Save
-        self._save_knowledge()
-        self._save_index()
+        results = []
+        new_entries = []
+        seen = {}
         
-        print(f"ADDED: Knowledge - {entry['title']}")
+        for item in items:
+            content = item['content']
+            entry_id = self._generate_id(content)
+            
+            # Check if already exists (in the base or earlier in this batch)
+            existing = seen.get(entry_id) or self._find_existing(entry_id)
+            if existing:
+                results.append({"status": "exists", "entry": existing})
+                continue
+            
+            # Create entry
+            entry = {
+                "id": entry_id,
+                "faiss_id": self._next_faiss_id,
+                "title": item.get('title') or content[:50] + "...",
+                "content": content,
+                "source": item.get('source') or "user",
+                "created_at": datetime.now().isoformat(),
+                "metadata": item.get('metadata') or {}
+            }
+            self._next_faiss_id += 1
+            seen[entry_id] = entry
+            new_entries.append(entry)
+            results.append({"status": "added", "entry": entry})
+        
+        if not new_entries:
+            return results
+        
+        # Create all embeddings in one forward pass
+        embeddings = self._encode([entry['content'] for entry in new_entries])
+        
+        # Add to knowledge base and FAISS index
+        for entry in new_entries:
+            self._by_id[entry['id']] = len(self.knowledge_entries)
+            self._by_faiss_id[entry['faiss_id']] = len(self.knowledge_entries)
+            self.knowledge_entries.append(entry)
+        self.index.add_with_ids(embeddings, self._faiss_ids(new_entries))
+        self._append_embeddings(embeddings)
+        
+        # Append the entries now; snapshot the index every few adds
+        self._append_knowledge(new_entries)
+        self._unsaved_adds += len(new_entries)
+        if self._unsaved_adds >= INDEX_SAVE_INTERVAL:
+            self.flush()
+        
+        for entry in new_entries:
+            print(f"ADDED: Knowledge - {entry['title']}")
         
-        return {"status": "added", "entry": entry}
+        return results
     
     def query_knowledge(
         self, 
@@ -194,43 +476,77 @@ class KnowledgeBase:
         Args:
             query: Query text
             top_k: Number of top results to return
-            min_similarity: Minimum similarity threshold (0-1)
+            min_similarity: Minimum cosine similarity (-1 to 1)
             
         Returns:
             List of relevant knowledge entries with scores
         """
         if not self.is_available() or len(self.knowledge_entries) == 0:
             return []
+        self._ensure_index()
         
         # Encode query
-        query_embedding = self.model.encode([query])[0]
+        query_embedding = self._encode([query])
         
         # Search in FAISS
         k = min(top_k, len(self.knowledge_entries))
-        distances, indices = self.index.search(
-            np.array([query_embedding]).astype('float32'), 
-            k
-        )
+        self._set_ef_search(max(HNSW_EF_SEARCH, k))
+        scores, faiss_ids = self.index.search(query_embedding, k)
         
-        # Convert distances to similarity scores
-        # FAISS returns L2 distances, convert to cosine similarity approximation
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx >= 0 and idx < len(self.knowledge_entries):
-                # Convert L2 distance to similarity score (0-1)
-                # Lower distance = higher similarity
-                similarity = 1.0 / (1.0 + distance)
-                
-                if similarity >= min_similarity:
-                    entry = self.knowledge_entries[idx].copy()
-                    entry['similarity'] = float(similarity)
-                    entry['rank'] = i + 1
-                    results.append(entry)
+        results = self._collect_hits(scores[0], faiss_ids[0], min_similarity)
         
         print(f"FOUND: {len(results)} relevant entries for: {query[:50]}...")
         
         return results
     
+    def query_knowledge_batch(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        min_similarity: float = 0.5
+    ) -> List[List[Dict]]:
+        """
+        Query knowledge base for many queries at once (one encode pass, one FAISS search)
+        
+        Args:
+            queries: Query texts
+            top_k: Number of top results to return per query
+            min_similarity: Minimum cosine similarity (-1 to 1)
+            
+        Returns:
+            Relevant knowledge entries for each query, in input order
+        """
+        if not self.is_available() or len(self.knowledge_entries) == 0 or not queries:
+            return [[] for _ in queries]
+        self._ensure_index()
+        
+        query_embeddings = self._encode(list(queries))
+        
+        k = min(top_k, len(self.knowledge_entries))
+        self._set_ef_search(max(HNSW_EF_SEARCH, k))
+        scores, faiss_ids = self.index.search(query_embeddings, k)
+        
+        return [
+            self._collect_hits(row_scores, row_ids, min_similarity)
+            for row_scores, row_ids in zip(scores, faiss_ids)
+        ]
+    
+    def _collect_hits(self, scores: np.ndarray, faiss_ids: np.ndarray, min_similarity: float) -> List[Dict]:
+        """Turn one row of FAISS results into entries, keeping hits at or above min_similarity"""
+        # Scores are cosine similarities of the normalized embeddings; FAISS pads misses with -1
+        kept = np.flatnonzero((faiss_ids >= 0) & (scores >= min_similarity))
+        
+        results = []
+        for i in kept.tolist():
+            position = self._by_faiss_id.get(int(faiss_ids[i]))
+            if position is not None:
+                entry = self.knowledge_entries[position].copy()
+                entry['similarity'] = float(scores[i])
+                entry['rank'] = i + 1
+                results.append(entry)
+        
+        return results
+    
     def get_all_knowledge(self) -> List[Dict]:
         """Get all knowledge entries"""
         return self.knowledge_entries.copy()
@@ -247,17 +563,23 @@ class KnowledgeBase:
         """
         if not self.is_available():
             return False
+        self._ensure_index()
         
         # Find and remove entry
-        entry = next((e for e in self.knowledge_entries if e['id'] == entry_id), None)
-        if not entry:
+        position = self._by_id.get(entry_id)
+        if position is None:
             return False
         
-        self.knowledge_entries = [e for e in self.knowledge_entries if e['id'] != entry_id]
+        # Rows must line up with entries before one of each is removed
+        self._align_embeddings()
+        entry = self.knowledge_entries.pop(position)
+        self._rebuild_id_lookup()
+        self._embeddings = np.delete(self._embeddings, position, axis=0)
         
-        # Re-index (FAISS doesn't support deletion, need to rebuild)
-        self._reindex_all()
+        # Drop just this vector; the other embeddings are kept as they are
+        self._remove_vectors(self._faiss_ids([entry]))
         self._save_knowledge()
+        self.flush()
         
         print(f"DELETED: Knowledge - {entry['title']}")
         
@@ -275,11 +597,14 @@ class KnowledgeBase:
         
         count = len(self.knowledge_entries)
         self.knowledge_entries = []
+        self._reindex_pending = False
+        self._rebuild_id_lookup()
+        self._embeddings = np.empty((0, self.dimension), dtype=np.float32)
         
         # Create new empty index
         self._create_new_index()
         self._save_knowledge()
-        self._save_index()
+        self.flush()
         
         print(f"CLEARED: {count} knowledge entries")
         
@@ -291,7 +616,7 @@ class KnowledgeBase:
             "total_entries": len(self.knowledge_entries),
             "index_size": self.index.ntotal if self.index else 0,
             "dimension": self.dimension,
-            "model": "all-MiniLM-L6-v2" if self.model else None,
+            "model": self._model_name if self.is_available() else None,
             "available": self.is_available()
         }
     
@@ -3,11 +3,122 @@ LLM Integration - Groq (online) and Ollama (offline) support
 """
 
 import os
+import re
+import sys
+import time
+import hashlib
+import asyncio
+import aiohttp
 import requests
-from openai import OpenAI
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from operator import methodcaller
+from typing import Dict, List, Optional, Tuple
 import json
 
+# Incremental JSON parsing for large Ollama replies (optional)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Fast JSON encoding/decoding (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj, sort_keys: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys).encode()
+
+
+def _json_loads(data: bytes):
+    """Parse JSON bytes, with orjson when available"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+# m.get('name', '') for each /api/tags entry, without a Python-level attribute lookup per model
+_model_name = methodcaller('get', 'name', '')
+
+# Replies bigger than this are stream-parsed with ijson instead of loaded whole
+OLLAMA_STREAM_PARSE_BYTES = 64 * 1024
+
+# Exact-match response cache in front of chat()
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+# Only (near-)deterministic calls are cached; a sampled reply would be replayed unchanged
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+# Prompts whose answer depends on when they are asked are never cached
+UNCACHEABLE_PROMPT_RE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current(ly)?|latest|time|date|weather|news)\b",
+    re.IGNORECASE
+)
+
+
+def _is_groq_offline_error(error: Exception) -> bool:
+    """
+    Whether a Groq failure means "can't reach the API" (fall back to Ollama) rather than a bad request
+    
+    The SDK wraps httpx transport errors in APIConnectionError / APITimeoutError. openai is
+    imported lazily, so if it isn't loaded yet the error can't be one of its types.
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, (openai.APIConnectionError, openai.APITimeoutError))
+
+
+class _ResponseCache:
+    """LRU cache of chat responses whose entries expire after ttl seconds"""
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response, or None if missing or expired"""
+        item = self._data.get(key)
+        if item is None or time.monotonic() - item[0] >= self.ttl:
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+    
+    def set(self, key: str, value: Dict):
+        """Store a response, evicting the least recently used one when full"""
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        self._data.clear()
+        self.hits = self.misses = 0
+    
+    def stats(self) -> Dict:
+        """Size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
 class LLMClient:
     def __init__(self):
         self.groq_api_key = os.getenv("GROQ_API_KEY")
@@ -17,49 +128,192 @@ class LLMClient:
         self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")
         
+        # Ollama probe result is reused for this long (seconds)
+        self._ollama_ttl = float(os.getenv("OLLAMA_STATUS_TTL", "30"))
+        self._ollama_cache = {"ts": 0.0, "ok": False}
+        self._ollama_model_names: frozenset = frozenset()  # From the last /api/tags probe
+        # Once the model is found, /api/tags is only re-read this often; liveness uses a HEAD ping
+        self._ollama_tags_ttl = float(os.getenv("OLLAMA_TAGS_TTL", "300"))
+        self._ollama_tags_ts = 0.0  # When the model was last seen in /api/tags
+        self._ollama_target = self.ollama_model.split(':', 1)[0]  # Tag-less, matches any tag
+        
+        # Keep-alive connection pool for blocking Ollama calls
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+        
+        # aiohttp session for async calls, created lazily inside the running loop
+        self._aiohttp_session: Optional[aiohttp.ClientSession] = None
+        self._aiohttp_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self._response_cache = _ResponseCache(LLM_CACHE_SIZE, LLM_CACHE_TTL)
+        self._inflight: Dict[str, asyncio.Future] = {}  # Request key -> reply being generated
+        
+        # AsyncOpenAI client, created on the first Groq request so Ollama-only setups
+        # never import the SDK or build its HTTP pool
         self.groq_client = None
-        if self.groq_api_key:
-            self.groq_client = OpenAI(
-                api_key=self.groq_api_key,
-                base_url=self.groq_base_url
-            )
     
     def is_groq_available(self) -> bool:
         """Check if Groq API is available"""
-        return self.groq_client is not None and self.groq_api_key is not None
+        return bool(self.groq_api_key)
+    
+    def _get_groq_client(self):
+        """Get the Groq client (AsyncOpenAI), creating it on first use"""
+        if self.groq_client is None:
+            from openai import AsyncOpenAI
+            self.groq_client = AsyncOpenAI(
+                api_key=self.groq_api_key,
+                base_url=self.groq_base_url,
+                timeout=15.0  # 15 second timeout for Groq API (faster failover)
+            )
+        return self.groq_client
     
     def is_ollama_available(self) -> bool:
-        """Check if Ollama is running locally with the required model"""
+        """Check if Ollama is running locally with the required model (cached for OLLAMA_STATUS_TTL)"""
+        now = time.monotonic()
+        if self._ollama_cache["ts"] and now - self._ollama_cache["ts"] < self._ollama_ttl:
+            return self._ollama_cache["ok"]
+        
+        ok = self._probe_ollama()
+        self._ollama_cache = {"ts": now, "ok": ok}
+        return ok
+    
+    def _invalidate_ollama_cache(self):
+        """Force the next availability check to probe Ollama again"""
+        self._ollama_cache = {"ts": 0.0, "ok": False}
+    
+    async def ais_ollama_available(self) -> bool:
+        """Async version of is_ollama_available that doesn't block the event loop"""
+        now = time.monotonic()
+        if self._ollama_cache["ts"] and now - self._ollama_cache["ts"] < self._ollama_ttl:
+            return self._ollama_cache["ok"]
+        
+        ok = await self._aprobe_ollama()
+        self._ollama_cache = {"ts": now, "ok": ok}
+        return ok
+    
+    def _get_aiohttp_session(self) -> aiohttp.ClientSession:
+        """Get the aiohttp session for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._aiohttp_session is None or self._aiohttp_session.closed or self._aiohttp_loop is not loop:
+            self._aiohttp_loop = loop
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+            )
+        return self._aiohttp_session
+    
+    async def warmup(self):
+        """Load the Ollama model with a 1-token request so the first real chat doesn't pay for it"""
+        if os.getenv("OLLAMA_WARMUP", "false").lower() not in ("1", "true"):
+            return
+        if not await self.ais_ollama_available():
+            return
+        
+        try:
+            start = time.perf_counter()
+            await self._chat_ollama([{"role": "user", "content": "."}], 0.0, 1, False)
+            print(f"🔥 Ollama model '{self.ollama_model}' warmed up in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            print(f"⚠️ Ollama warmup failed: {str(e)}")
+    
+    async def close(self):
+        """Close pooled HTTP connections"""
+        if self._aiohttp_session is not None and not self._aiohttp_session.closed:
+            await self._aiohttp_session.close()
+        self._aiohttp_session = None
+        self._http.close()
+        if self.groq_client is not None:
+            await self.groq_client.close()
+            self.groq_client = None
+    
+    def _probe_ollama(self) -> bool:
+        """Cheap liveness ping, then the (rarely refreshed) model check"""
+        return self._ollama_alive() and self._ollama_has_model()
+    
+    async def _aprobe_ollama(self) -> bool:
+        """Async version of _probe_ollama"""
+        return await self._aollama_alive() and await self._aollama_has_model()
+    
+    def _ollama_alive(self) -> bool:
+        """HEAD the Ollama root; any HTTP response means the service is up"""
+        try:
+            self._http.head(f"{self.ollama_url}/", timeout=1)
+            return True
+        except requests.exceptions.RequestException:
+            return False
+    
+    async def _aollama_alive(self) -> bool:
+        """Async version of _ollama_alive"""
+        try:
+            async with self._get_aiohttp_session().head(
+                f"{self.ollama_url}/", timeout=aiohttp.ClientTimeout(total=1)
+            ):
+                return True
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+    
+    def _ollama_tags_fresh(self) -> bool:
+        """Whether the model was seen in /api/tags within OLLAMA_TAGS_TTL"""
+        return bool(self._ollama_tags_ts) and time.monotonic() - self._ollama_tags_ts < self._ollama_tags_ttl
+    
+    def _ollama_has_model(self) -> bool:
+        """Ask Ollama for its model list and check ours is installed"""
+        if self._ollama_tags_fresh():
+            return True
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=2)
+            response = self._http.get(f"{self.ollama_url}/api/tags", timeout=2)
             if response.status_code == 200:
-                # Check if our model is available
-                data = response.json()
-                models = data.get('models', [])
-                model_names = [m.get('name', '').split(':')[0] for m in models]
-                # Check if our model exists (with or without tag)
-                # Handle both 'llama3.2' and 'llama3.2:latest' formats
-                has_model = any(
-                    self.ollama_model == name or 
-                    self.ollama_model in name or 
-                    name in self.ollama_model 
-                    for name in model_names
-                )
-                if has_model:
-                    print(f"✅ Ollama is running with model '{self.ollama_model}'")
-                else:
-                    print(f"⚠️ Ollama is running but model '{self.ollama_model}' not found")
-                    print(f"💡 Available models: {model_names}")
-                    print(f"💡 You can install it with: ollama pull {self.ollama_model}")
-                return has_model
+                return self._record_ollama_tags(response.json())
             return False
         except requests.exceptions.ConnectionError:
             # Ollama service is not running
             return False
-        except Exception as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # Timeout or a malformed reply; the negative result is cached like any other
+            print(f"⚠️ Ollama check failed: {str(e)}")
+            return False
+    
+    async def _aollama_has_model(self) -> bool:
+        """Async version of _ollama_has_model"""
+        if self._ollama_tags_fresh():
+            return True
+        try:
+            async with self._get_aiohttp_session().get(
+                f"{self.ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=2)
+            ) as response:
+                if response.status == 200:
+                    return self._record_ollama_tags(await response.json())
+                return False
+        except aiohttp.ClientConnectionError:
+            # Ollama service is not running
+            return False
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            # Timeout or a malformed reply; the negative result is cached like any other
             print(f"⚠️ Ollama check failed: {str(e)}")
             return False
     
+    def _record_ollama_tags(self, data: Dict) -> bool:
+        """Check an /api/tags response; only a found model is cached (so a fresh pull is noticed)"""
+        has_model = self._has_ollama_model(data)
+        self._ollama_tags_ts = time.monotonic() if has_model else 0.0
+        return has_model
+    
+    def _has_ollama_model(self, data: Dict) -> bool:
+        """Check an /api/tags response for the configured model"""
+        # Compare tag-less names, so 'llama3.2' matches 'llama3.2:latest' (but not 'llama3')
+        self._ollama_model_names = frozenset(
+            name.partition(':')[0] for name in map(_model_name, data.get('models', ()))
+        )
+        has_model = self._ollama_target in self._ollama_model_names
+        if has_model:
+            print(f"✅ Ollama is running with model '{self.ollama_model}'")
+        else:
+            print(f"⚠️ Ollama is running but model '{self.ollama_model}' not found")
+            print(f"💡 Available models: {sorted(self._ollama_model_names)}")
+            print(f"💡 You can install it with: ollama pull {self.ollama_model}")
+        return has_model
+    
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -81,15 +335,96 @@ class LLMClient:
         Returns:
             Dict with 'message', 'provider', 'model'
         """
+        if stream:
+            return await self._route_chat(messages, provider, temperature, max_tokens, stream)
+        
+        key = self._request_key(messages, provider, temperature, max_tokens)
+        cacheable = self._is_cacheable(messages, temperature)
+        if cacheable:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                return dict(cached)
         
+        # Single-flight: identical requests already in progress share one provider call
+        pending = self._inflight.get(key)
+        if pending is not None:
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                return dict(pending.result())  # Re-raises the leader's error, if any
+            # The leading request was cancelled; make our own
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._route_chat(messages, provider, temperature, max_tokens, stream)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: nobody may be waiting on it
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        
+        future.set_result(result)
+        if cacheable:
+            self._response_cache.set(key, dict(result))
+        return result
+    
+    @staticmethod
+    def _is_cacheable(messages: List[Dict[str, str]], temperature: float) -> bool:
+        """Whether a reply can be reused later (not for sampled replies or time-sensitive prompts)"""
+        if temperature > LLM_CACHE_MAX_TEMPERATURE:
+            return False
+        last_user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        return isinstance(last_user, str) and not UNCACHEABLE_PROMPT_RE.search(last_user)
+    
+    def _request_key(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Hash of everything that shapes a reply"""
+        payload = _json_dumps({
+            "provider": provider,
+            "models": [self.groq_model, self.ollama_model],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": messages
+        }, sort_keys=True)
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def clear_cache(self):
+        """Drop all cached responses"""
+        self._response_cache.clear()
+    
+    def get_cache_stats(self) -> Dict:
+        """Response cache size and hit rate"""
+        return self._response_cache.stats()
+    
+    async def _route_chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> Dict:
+        """Pick a provider (auto-detecting if asked) and send the request, with fallback"""
         original_provider = provider
         auto_mode = (provider == "auto")
         
         # Auto-detect provider with smart fallback
         if provider == "auto":
-            # Check both providers
-            groq_available = self.is_groq_available()
-            ollama_available = self.is_ollama_available()
+            # Check both providers concurrently
+            groq_available, ollama_available = await asyncio.gather(
+                asyncio.to_thread(self.is_groq_available),
+                self.ais_ollama_available()
+            )
             
             if groq_available:
                 provider = "groq"
@@ -114,7 +449,7 @@ class LLMClient:
                 return await self._chat_groq(messages, temperature, max_tokens, stream, fallback_to_ollama=True)
             except Exception as e:
                 # If Groq fails and we were in auto mode, try Ollama as fallback
-                if auto_mode and self.is_ollama_available():
+                if auto_mode and await self.ais_ollama_available():
                     print(f"⚠️ Groq request failed: {str(e)}")
                     print(f"🔄 Attempting fallback to Ollama...")
                     return await self._chat_ollama(messages, temperature, max_tokens, stream)
@@ -134,56 +469,47 @@ class LLMClient:
     ) -> Dict:
         """Chat with Groq API with timeout and automatic fallback to Ollama"""
         try:
-            import asyncio
-            import concurrent.futures
-            
-            # Run synchronous Groq API call in thread pool with timeout
-            def _make_request():
-                return self.groq_client.chat.completions.create(
-                    model=self.groq_model,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=stream,
-                    timeout=15.0  # 15 second timeout for Groq API (faster failover)
-                )
-            
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                response = await asyncio.wait_for(
-                    loop.run_in_executor(executor, _make_request),
-                    timeout=15.0  # 15 second timeout (faster failover)
-                )
+            completions = self._get_groq_client().chat.completions
+            request = dict(
+                model=self.groq_model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=stream
+            )
             
+            # Cap the whole call (including SDK retries) at 15 seconds for faster failover
             if stream:
-                # Handle streaming response
+                response = await asyncio.wait_for(completions.create(**request), timeout=15.0)
+                # Handle streaming response (async iterator of text chunks)
                 return {
-                    "stream": response,
+                    "stream": self._stream_groq(response),
                     "provider": "groq",
                     "model": self.groq_model
                 }
             else:
-                message_content = response.choices[0].message.content
+                # Read the raw body: we only need two fields, not the SDK's pydantic model tree
+                raw = await asyncio.wait_for(completions.with_raw_response.create(**request), timeout=15.0)
+                data = _json_loads(raw.http_response.content)
+                usage = data.get("usage") or {}
                 return {
-                    "message": message_content,
+                    "message": data["choices"][0]["message"]["content"],
                     "provider": "groq",
                     "model": self.groq_model,
                     "usage": {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens
+                        "prompt_tokens": usage.get("prompt_tokens"),
+                        "completion_tokens": usage.get("completion_tokens"),
+                        "total_tokens": usage.get("total_tokens")
                     }
                 }
         except Exception as e:
-            error_msg = str(e).lower()
+            # Re-probe Ollama now rather than trust a result from before Groq failed
+            self._invalidate_ollama_cache()
             # Check if it's a network error or offline scenario
-            is_offline = any(keyword in error_msg for keyword in [
-                "connection", "timeout", "network", "unreachable", 
-                "refused", "failed to resolve", "offline"
-            ])
+            is_offline = _is_groq_offline_error(e)
             
             # If Groq fails and Ollama is available, fallback automatically
-            if fallback_to_ollama and is_offline and self.is_ollama_available():
+            if fallback_to_ollama and is_offline and await self.ais_ollama_available():
                 print(f"⚠️ Groq API error: {str(e)}")
                 print(f"🔄 Falling back to Ollama (offline mode)")
                 return await self._chat_ollama(messages, temperature, max_tokens, stream)
@@ -199,8 +525,6 @@ class LLMClient:
     ) -> Dict:
         """Chat with Ollama (local) with timeout"""
         try:
-            import asyncio
-            import aiohttp
             url = f"{self.ollama_url}/api/chat"
             
             # Convert messages to Ollama format
@@ -214,26 +538,42 @@ class LLMClient:
                 }
             }
             
-            # Use longer timeout for Ollama (local processing can take time)
-            response = requests.post(url, json=payload, timeout=60)
+            # Use longer timeout for Ollama (local processing can take time);
+            # a stream only has to keep producing lines, not finish within it
+            timeout = (aiohttp.ClientTimeout(total=None, sock_read=60) if stream
+                       else aiohttp.ClientTimeout(total=60))
+            response = await self._get_aiohttp_session().post(
+                url,
+                data=_json_dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=timeout
+            )
             
-            if response.status_code != 200:
-                error_text = response.text
+            if response.status != 200:
+                async with response:
+                    error_text = await response.text()
                 if "not found" in error_text.lower():
                     raise Exception(f"Ollama model '{self.ollama_model}' not found. Install it with: ollama pull {self.ollama_model}")
                 raise Exception(f"Ollama error: {error_text}")
             
             if stream:
-                # Return streaming response
+                # Return streaming response (async iterator of text chunks)
                 return {
-                    "stream": response.iter_lines(),
+                    "stream": self._stream_ollama(response),
                     "provider": "ollama",
                     "model": self.ollama_model
                 }
             else:
-                # Parse non-streaming response
-                result = response.json()
-                message_content = result.get("message", {}).get("content", "")
+                # Parse non-streaming response (large ones incrementally: only message.content is needed)
+                async with response:
+                    if IJSON_AVAILABLE and (response.content_length or 0) > OLLAMA_STREAM_PARSE_BYTES:
+                        message_content = ""
+                        async for content in ijson.items_async(response.content, "message.content"):
+                            message_content = content
+                            break
+                    else:
+                        result = _json_loads(await response.read())
+                        message_content = result.get("message", {}).get("content", "")
                 if not message_content:
                     raise Exception("Ollama returned empty response")
                 return {
@@ -241,9 +581,10 @@ class LLMClient:
                     "provider": "ollama",
                     "model": self.ollama_model
                 }
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
+            self._invalidate_ollama_cache()
             raise Exception(f"Ollama service is not running. Start it with: ollama serve")
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             raise Exception(f"Ollama request timed out. The model may be processing - try again.")
         except Exception as e:
             error_msg = str(e)
@@ -251,6 +592,34 @@ class LLMClient:
                 raise Exception(f"Ollama service is not running. Start it with: ollama serve")
             raise Exception(f"Ollama error: {str(e)}")
     
+    @staticmethod
+    async def _stream_ollama(response: aiohttp.ClientResponse):
+        """Yield message text from a streaming Ollama response as each line arrives"""
+        try:
+            async for line in response.content:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                if chunk.get("error"):
+                    raise Exception(f"Ollama error: {chunk['error']}")
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    yield content
+                if chunk.get("done"):
+                    break
+        finally:
+            response.release()
+    
+    @staticmethod
+    async def _stream_groq(response):
+        """Yield message text from a streaming Groq (OpenAI-compatible) response"""
+        async for chunk in response:
+            if chunk.choices:
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+    
     def get_status(self) -> Dict:
         """Get status of all LLM providers"""
         return {
@@ -6,186 +6,299 @@ Uses SQLite for storage
 import sqlite3
 import json
 import os
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import uuid
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 DATABASE_PATH = os.getenv("DATABASE_PATH", "./data/memory.db")
 
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection with the per-connection PRAGMAs applied"""
+    # Shared across threads by MemoryManager (which serializes access with a lock)
+    # Wait up to 5s on a locked database; keep compiled statements for the hot queries
+    conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; fsync at checkpoints only
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+def _json_dumps(obj) -> str:
+    """Serialize context data for a TEXT column, with orjson when available"""
+    if ORJSON_AVAILABLE:
+        # Non-string keys are stringified, matching json.dumps
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+def _json_loads(data: str):
+    """Parse a stored JSON column, with orjson when available"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+SCHEMA_VERSION = 1  # Bump whenever SCHEMA_SQL changes so existing databases re-run it
+
+# Idempotent schema + one-time data migrations, run as a single script
+SCHEMA_SQL = f"""
+    BEGIN;
+
+    -- Users table
+    CREATE TABLE IF NOT EXISTS users (
+        user_id TEXT PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- User memory table (long-term facts and summary)
+    CREATE TABLE IF NOT EXISTS user_memory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        memory_summary TEXT,
+        facts TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+
+    -- Chat sessions table
+    CREATE TABLE IF NOT EXISTS chat_sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        title TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+
+    -- Chat messages table
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id),
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+
+    -- Conversation context table (for topic tracking)
+    CREATE TABLE IF NOT EXISTS conversation_context (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        context_data TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id),
+        FOREIGN KEY (user_id) REFERENCES users(user_id),
+        UNIQUE(session_id)
+    );
+
+    -- User facts table (one row per fact; replaces the JSON list in user_memory.facts)
+    CREATE TABLE IF NOT EXISTS user_facts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        fact TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+
+    -- One memory row per user (lets update_user_memory upsert); keep the newest row
+    -- of any duplicates written by earlier versions before enforcing it
+    DELETE FROM user_memory
+    WHERE id NOT IN (SELECT MAX(id) FROM user_memory GROUP BY user_id);
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_user_memory_user ON user_memory(user_id);
+
+    -- Move facts still stored as JSON in user_memory into user_facts (no-op once migrated)
+    INSERT INTO user_facts (user_id, fact)
+    SELECT user_memory.user_id, json_each.value
+    FROM user_memory, json_each(user_memory.facts)
+    WHERE user_memory.facts IS NOT NULL AND user_memory.facts != ''
+    ORDER BY user_memory.id, json_each.key;
+    UPDATE user_memory SET facts = NULL WHERE facts IS NOT NULL;
+
+    -- Deleting a session cascades to its messages and context in the same statement.
+    -- A trigger rather than ON DELETE CASCADE: existing tables keep their FK clauses and
+    -- foreign_keys stays off, since messages may reference sessions that were never created
+    CREATE TRIGGER IF NOT EXISTS trg_chat_sessions_delete
+    AFTER DELETE ON chat_sessions
+    BEGIN
+        DELETE FROM messages WHERE session_id = OLD.session_id;
+        DELETE FROM conversation_context WHERE session_id = OLD.session_id;
+    END;
+
+    -- Indexes for the per-session / per-user lookups (range scans instead of table scans + sort)
+    CREATE INDEX IF NOT EXISTS idx_messages_session_ts ON messages(session_id, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_messages_user ON messages(user_id);
+    CREATE INDEX IF NOT EXISTS idx_sessions_user_created ON chat_sessions(user_id, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_user_facts_user ON user_facts(user_id);
+
+    PRAGMA user_version = {SCHEMA_VERSION};
+    COMMIT;
+"""
+
+
 def initialize_database():
     """Create database and tables if they don't exist"""
     os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
     
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            user_id TEXT PRIMARY KEY,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # User memory table (long-term facts and summary)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS user_memory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            memory_summary TEXT,
-            facts TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    """)
+    conn = _connect(DATABASE_PATH)
+    # WAL is stored in the database file, so setting it once covers every later connection
+    conn.execute("PRAGMA journal_mode=WAL")
     
-    # Chat sessions table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS chat_sessions (
-            session_id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            title TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    """)
-    
-    # Chat messages table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            role TEXT NOT NULL,
-            content TEXT NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id),
-            FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
-    """)
+    # Already at the current schema: skip re-parsing the DDL on every start
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        conn.executescript(SCHEMA_SQL)
     
-    # Conversation context table (for topic tracking)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS conversation_context (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            context_data TEXT NOT NULL,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id),
-            FOREIGN KEY (user_id) REFERENCES users(user_id),
-            UNIQUE(session_id)
-        )
-    """)
-    
-    conn.commit()
     conn.close()
     print(f"✅ Database initialized at {DATABASE_PATH}")
 
 class MemoryManager:
+    # Hot-path statements. The connection caches compiled statements by SQL text,
+    # so these are prepared once and reused for the life of the shared connection.
+    CREATE_USER_SQL = "INSERT OR IGNORE INTO users (user_id) VALUES (?)"
+    GET_USER_MEMORY_SQL = """
+        SELECT memory_summary, updated_at
+        FROM user_memory
+        WHERE user_id = ?
+    """
+    GET_USER_FACTS_SQL = """
+        SELECT fact
+        FROM user_facts
+        WHERE user_id = ?
+        ORDER BY id
+    """
+    ADD_USER_FACT_SQL = "INSERT INTO user_facts (user_id, fact) VALUES (?, ?)"
+    CREATE_SESSION_SQL = """
+        INSERT INTO chat_sessions (session_id, user_id)
+        VALUES (?, ?)
+    """
+    SAVE_MESSAGE_SQL = """
+        INSERT INTO messages (session_id, user_id, role, content)
+        VALUES (?, ?, ?, ?)
+    """
+    # Newest N messages, returned oldest first. id breaks ties between messages
+    # saved in the same second (e.g. a user/assistant pair from save_messages)
+    SESSION_MESSAGES_SQL = """
+        SELECT role, content, timestamp FROM (
+            SELECT id, role, content, timestamp
+            FROM messages
+            WHERE session_id = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        )
+        ORDER BY timestamp ASC, id ASC
+    """
+    SAVE_CONTEXT_SQL = """
+        INSERT INTO conversation_context (session_id, user_id, context_data, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(session_id) 
+        DO UPDATE SET 
+            context_data = excluded.context_data,
+            updated_at = excluded.updated_at
+    """
+    UPDATE_USER_MEMORY_SQL = """
+        INSERT INTO user_memory (user_id, memory_summary)
+        VALUES (?, ?)
+        ON CONFLICT(user_id)
+        DO UPDATE SET
+            memory_summary = excluded.memory_summary,
+            updated_at = CURRENT_TIMESTAMP
+    """
+    # Bump updated_at for new facts, creating an empty summary row if needed
+    TOUCH_USER_MEMORY_SQL = """
+        INSERT INTO user_memory (user_id, memory_summary)
+        VALUES (?, '')
+        ON CONFLICT(user_id)
+        DO UPDATE SET updated_at = CURRENT_TIMESTAMP
+    """
+    GET_CONTEXT_SQL = """
+        SELECT context_data 
+        FROM conversation_context 
+        WHERE session_id = ?
+    """
+    
     def __init__(self):
         self.db_path = DATABASE_PATH
+        
+        # One long-lived connection (opened on first use), serialized by a lock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
     
-    def _get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the shared database connection (call with self._lock held)"""
+        if self._conn is None:
+            self._conn = _connect(self.db_path)
+            # Rows stay indexable (row[0]) and also convert straight to dicts
+            self._conn.row_factory = sqlite3.Row
+        return self._conn
+    
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
     
     def create_user(self, user_id: Optional[str] = None) -> str:
         """Create a new user or return existing"""
         if not user_id:
             user_id = str(uuid.uuid4())
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(
-                "INSERT OR IGNORE INTO users (user_id) VALUES (?)",
-                (user_id,)
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.CREATE_USER_SQL, (user_id,))
         
         return user_id
     
     def get_user_memory(self, user_id: str) -> Dict:
         """Get user's long-term memory"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self._get_connection()
+            row = conn.execute(self.GET_USER_MEMORY_SQL, (user_id,)).fetchone()
+            facts = [fact for (fact,) in conn.execute(self.GET_USER_FACTS_SQL, (user_id,))] if row else []
         
-        try:
-            cursor.execute("""
-                SELECT memory_summary, facts, updated_at
-                FROM user_memory
-                WHERE user_id = ?
-                ORDER BY updated_at DESC
-                LIMIT 1
-            """, (user_id,))
-            
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    "memory_summary": row[0],
-                    "facts": json.loads(row[1]) if row[1] else [],
-                    "updated_at": row[2]
-                }
-            else:
-                return {
-                    "memory_summary": "",
-                    "facts": [],
-                    "updated_at": None
-                }
-        finally:
-            conn.close()
+        if row:
+            return {
+                "memory_summary": row[0],
+                "facts": facts,
+                "updated_at": row[1]
+            }
+        else:
+            return {
+                "memory_summary": "",
+                "facts": [],
+                "updated_at": None
+            }
     
     def update_user_memory(self, user_id: str, memory_summary: str, facts: List[str]):
-        """Update user's long-term memory"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        """Update user's long-term memory (replaces the summary and the full fact list)"""
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.UPDATE_USER_MEMORY_SQL, (user_id, memory_summary))
+            conn.execute("DELETE FROM user_facts WHERE user_id = ?", (user_id,))
+            conn.executemany(self.ADD_USER_FACT_SQL, [(user_id, fact) for fact in facts])
+    
+    def add_memories(self, user_id: str, facts: List[str]):
+        """Append several facts to user's long-term memory in one transaction"""
+        if not facts:
+            return
         
-        try:
-            # Check if memory exists
-            cursor.execute(
-                "SELECT id FROM user_memory WHERE user_id = ?",
-                (user_id,)
-            )
-            exists = cursor.fetchone()
-            
-            if exists:
-                cursor.execute("""
-                    UPDATE user_memory
-                    SET memory_summary = ?, facts = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ?
-                """, (memory_summary, json.dumps(facts), user_id))
-            else:
-                cursor.execute("""
-                    INSERT INTO user_memory (user_id, memory_summary, facts)
-                    VALUES (?, ?, ?)
-                """, (user_id, memory_summary, json.dumps(facts)))
-            
-            conn.commit()
-        finally:
-            conn.close()
+        # Appends only insert the new rows; existing facts are not read or rewritten
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.TOUCH_USER_MEMORY_SQL, (user_id,))
+            conn.executemany(self.ADD_USER_FACT_SQL, [(user_id, fact) for fact in facts])
     
     def create_chat_session(self, user_id: str, session_id: Optional[str] = None) -> str:
         """Create a new chat session"""
         if not session_id:
             session_id = str(uuid.uuid4())
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO chat_sessions (session_id, user_id)
-                VALUES (?, ?)
-            """, (session_id, user_id))
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.CREATE_SESSION_SQL, (session_id, user_id))
         
         return session_id
     
@@ -197,17 +310,31 @@ class MemoryManager:
         content: str
     ):
         """Save a message to the database"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.SAVE_MESSAGE_SQL, (session_id, user_id, role, content))
+    
+    def save_messages(
+        self,
+        session_id: str,
+        user_id: str,
+        items: List[Tuple[str, str]]
+    ):
+        """
+        Save several messages in one transaction (one commit per chat turn)
         
-        try:
-            cursor.execute("""
-                INSERT INTO messages (session_id, user_id, role, content)
-                VALUES (?, ?, ?, ?)
-            """, (session_id, user_id, role, content))
-            conn.commit()
-        finally:
-            conn.close()
+        Args:
+            session_id: Chat session ID
+            user_id: User ID
+            items: (role, content) pairs in conversation order
+        """
+        if not items:
+            return
+        
+        with self._lock, self._get_connection() as conn:
+            conn.executemany(
+                self.SAVE_MESSAGE_SQL,
+                [(session_id, user_id, role, content) for role, content in items]
+            )
     
     def get_session_messages(
         self,
@@ -215,88 +342,54 @@ class MemoryManager:
         limit: Optional[int] = 50
     ) -> List[Dict]:
         """Get messages from a chat session"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            query = """
-                SELECT role, content, timestamp
-                FROM messages
-                WHERE session_id = ?
-                ORDER BY timestamp DESC
-            """
-            
-            if limit:
-                query += f" LIMIT {limit}"
-            
-            cursor.execute(query, (session_id,))
-            rows = cursor.fetchall()
-            
-            messages = [
-                {
-                    "role": row[0],
-                    "content": row[1],
-                    "timestamp": row[2]
-                }
-                for row in reversed(rows)  # Reverse to get chronological order
-            ]
-            
-            return messages
-        finally:
-            conn.close()
+        # LIMIT is bound (-1 means no limit) so every call shares one cached statement
+        with self._lock:
+            cursor = self._get_connection().execute(
+                self.SESSION_MESSAGES_SQL,
+                (session_id, limit if limit else -1)
+            )
+            # Build the role/content/timestamp dicts while stepping the cursor,
+            # without an intermediate list of tuples
+            return [dict(row) for row in cursor]
     
     def get_user_sessions(self, user_id: str, limit: int = 10) -> List[Dict]:
         """Get user's recent chat sessions"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
+        with self._lock:
+            rows = self._get_connection().execute("""
                 SELECT session_id, created_at, title
                 FROM chat_sessions
                 WHERE user_id = ?
                 ORDER BY created_at DESC
                 LIMIT ?
-            """, (user_id, limit))
-            
-            rows = cursor.fetchall()
-            
-            sessions = [
-                {
-                    "session_id": row[0],
-                    "created_at": row[1],
-                    "title": row[2] or "Untitled Chat"
-                }
-                for row in rows
-            ]
-            
-            return sessions
-        finally:
-            conn.close()
+            """, (user_id, limit)).fetchall()
+        
+        sessions = [
+            {
+                "session_id": row[0],
+                "created_at": row[1],
+                "title": row[2] or "Untitled Chat"
+            }
+            for row in rows
+        ]
+        
+        return sessions
     
     def clear_user_memory(self, user_id: str):
         """Clear all memory for a user (keep chat history)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("DELETE FROM user_memory WHERE user_id = ?", (user_id,))
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            conn.execute("DELETE FROM user_memory WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM user_facts WHERE user_id = ?", (user_id,))
     
     def delete_session(self, session_id: str):
         """Delete a chat session and its messages"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
-            cursor.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
-            cursor.execute("DELETE FROM conversation_context WHERE session_id = ?", (session_id,))
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            # trg_chat_sessions_delete removes the session's messages and context
+            deleted = conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,)).rowcount
+            
+            if not deleted:
+                # Messages saved under a session ID that was never registered
+                conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+                conn.execute("DELETE FROM conversation_context WHERE session_id = ?", (session_id,))
     
     def save_conversation_context(self, session_id: str, user_id: str, context_data: Dict):
         """
@@ -307,24 +400,10 @@ class MemoryManager:
             user_id: User identifier
             context_data: Dictionary containing conversation context
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        context_json = _json_dumps(context_data)
         
-        try:
-            context_json = json.dumps(context_data)
-            
-            cursor.execute("""
-                INSERT INTO conversation_context (session_id, user_id, context_data, updated_at)
-                VALUES (?, ?, ?, ?)
-                ON CONFLICT(session_id) 
-                DO UPDATE SET 
-                    context_data = excluded.context_data,
-                    updated_at = excluded.updated_at
-            """, (session_id, user_id, context_json, datetime.now()))
-            
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            conn.execute(self.SAVE_CONTEXT_SQL, (session_id, user_id, context_json, datetime.now()))
     
     def get_conversation_context(self, session_id: str) -> Optional[Dict]:
         """
@@ -336,34 +415,17 @@ class MemoryManager:
         Returns:
             Dictionary with conversation context or None
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            row = self._get_connection().execute(self.GET_CONTEXT_SQL, (session_id,)).fetchone()
         
-        try:
-            cursor.execute("""
-                SELECT context_data 
-                FROM conversation_context 
-                WHERE session_id = ?
-            """, (session_id,))
-            
-            row = cursor.fetchone()
-            
-            if row:
-                return json.loads(row[0])
-            return None
-        finally:
-            conn.close()
+        if row:
+            return _json_loads(row[0])
+        return None
     
     def clear_conversation_context(self, session_id: str):
         """Clear conversation context for a session (for 'new topic' command)"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("DELETE FROM conversation_context WHERE session_id = ?", (session_id,))
-            conn.commit()
-        finally:
-            conn.close()
+        with self._lock, self._get_connection() as conn:
+            conn.execute("DELETE FROM conversation_context WHERE session_id = ?", (session_id,))
 
 # Singleton instance
 memory_manager = MemoryManager()
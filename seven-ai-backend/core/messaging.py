@@ -3,10 +3,16 @@ Messaging System - SMS and WhatsApp via Twilio
 """
 
 import os
+import asyncio
+import logging
 from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
 from twilio.rest import Client
+from twilio.http.http_client import TwilioHttpClient
 from twilio.base.exceptions import TwilioRestException
 
+logger = logging.getLogger(__name__)
+
 class MessagingManager:
     def __init__(self):
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
@@ -19,7 +25,11 @@ class MessagingManager:
         
         if self.account_sid and self.auth_token:
             try:
-                self.client = Client(self.account_sid, self.auth_token)
+                self.client = Client(
+                    self.account_sid,
+                    self.auth_token,
+                    http_client=self._create_http_client()
+                )
                 self.twilio_enabled = True
                 print("SUCCESS: Twilio messaging enabled")
             except Exception as e:
@@ -27,6 +37,21 @@ class MessagingManager:
         else:
             print("INFO: Twilio not configured - using console fallback")
     
+    @staticmethod
+    def _create_http_client() -> TwilioHttpClient:
+        """
+        Create the HTTP client shared by every Twilio request
+        
+        One pooled keep-alive session, sized for concurrent sends from worker
+        threads, so repeated messages reuse a warm TLS connection to api.twilio.com.
+        """
+        http_client = TwilioHttpClient(pool_connections=True)
+        http_client.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=2)
+        )
+        return http_client
+    
     async def send_sms(
         self,
         to: str,
@@ -48,18 +73,9 @@ class MessagingManager:
             from_number = self.phone_number
         
         if not self.twilio_enabled:
-            # Console fallback
-            print(f"""
-╔══════════════════════════════════════╗
-║          📱 SMS MESSAGE              ║
-╠══════════════════════════════════════╣
-║  From: {from_number}
-║  To:   {to}
-║  
-║  Message:
-║  {message}
-╚══════════════════════════════════════╝
-            """)
+            # Console fallback (enable DEBUG logging for core.messaging to see messages)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("SMS from=%s to=%s body=%s", from_number, to, message)
             
             return {
                 "success": True,
@@ -68,7 +84,9 @@ class MessagingManager:
             }
         
         try:
-            sms = self.client.messages.create(
+            # The Twilio SDK is blocking; keep it off the event loop
+            sms = await asyncio.to_thread(
+                self.client.messages.create,
                 body=message,
                 from_=from_number,
                 to=to
@@ -122,18 +140,9 @@ class MessagingManager:
             from_number = f"whatsapp:{from_number}"
         
         if not self.twilio_enabled:
-            # Console fallback
-            print(f"""
-╔══════════════════════════════════════╗
-║        💬 WHATSAPP MESSAGE           ║
-╠══════════════════════════════════════╣
-║  From: {from_number}
-║  To:   {to}
-║  
-║  Message:
-║  {message}
-╚══════════════════════════════════════╝
-            """)
+            # Console fallback (enable DEBUG logging for core.messaging to see messages)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("WhatsApp from=%s to=%s body=%s", from_number, to, message)
             
             return {
                 "success": True,
@@ -142,7 +151,9 @@ class MessagingManager:
             }
         
         try:
-            wa_message = self.client.messages.create(
+            # The Twilio SDK is blocking; keep it off the event loop
+            wa_message = await asyncio.to_thread(
+                self.client.messages.create,
                 body=message,
                 from_=from_number,
                 to=to
@@ -114,6 +114,15 @@ class PersonalityManager:
         )
     }
     
+    # Precomputed per-name strings for the chat hot path (keys are already lowercase)
+    _PROMPT_BY_NAME = {name: p.system_prompt for name, p in PERSONALITIES.items()}
+    _DESC_BY_NAME = {
+        name: f"{p.emoji} {p.name}: {p.description}"
+        for name, p in PERSONALITIES.items()
+    }
+    # PERSONALITIES never changes, so the public listing is built once and shared
+    _ALL_PERSONALITIES = {name: p.to_dict() for name, p in PERSONALITIES.items()}
+    
     def __init__(self):
         """Initialize personality manager"""
         self.default_personality = "friendly"
@@ -135,12 +144,9 @@ class PersonalityManager:
         Get all available personalities
         
         Returns:
-            Dictionary of personality name -> personality info
+            Dictionary of personality name -> personality info (shared; do not mutate)
         """
-        return {
-            name: personality.to_dict()
-            for name, personality in self.PERSONALITIES.items()
-        }
+        return self._ALL_PERSONALITIES
     
     def get_default_personality(self) -> Personality:
         """Get the default personality (Friendly)"""
@@ -168,12 +174,12 @@ class PersonalityManager:
         Returns:
             System prompt string for the personality
         """
-        personality = self.get_personality(personality_name)
-        if personality:
-            return personality.system_prompt
+        prompt = self._PROMPT_BY_NAME.get(personality_name.lower())
+        if prompt is not None:
+            return prompt
         
         # Default to friendly
-        return self.get_default_personality().system_prompt
+        return self._PROMPT_BY_NAME[self.default_personality]
     
     def get_personality_description(self, personality_name: str) -> str:
         """
@@ -185,9 +191,9 @@ class PersonalityManager:
         Returns:
             Description string
         """
-        personality = self.get_personality(personality_name)
-        if personality:
-            return f"{personality.emoji} {personality.name}: {personality.description}"
+        description = self._DESC_BY_NAME.get(personality_name.lower())
+        if description is not None:
+            return description
         
         return "😊 Friendly: Warm, approachable, and conversational"
 
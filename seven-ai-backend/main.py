@@ -7,11 +7,15 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import os
 from dotenv import load_dotenv
 
 from routes import chat_routes, memory_routes, message_routes, vision_routes, emotion_routes, language_routes, personality_routes, knowledge_routes, feedback_routes, integration_routes, dev_routes
-from core.memory import initialize_database
+from core.memory import initialize_database, memory_manager
+from core.integrations import integration_manager
+from core.knowledge import knowledge_base
+from core.llm import llm_client
 
 # Load environment variables
 load_dotenv()
@@ -22,9 +26,16 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting Seven AI Backend...")
     initialize_database()
     print("✅ Database initialized")
+    # Load the local model in the background (OLLAMA_WARMUP=true) so startup isn't delayed
+    warmup_task = asyncio.create_task(llm_client.warmup())
     print("🌐 Server ready!")
     yield
     print("👋 Shutting down Seven AI Backend...")
+    warmup_task.cancel()
+    await integration_manager.close()
+    await llm_client.close()
+    knowledge_base.flush()
+    memory_manager.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -119,7 +119,7 @@ async def execute_action(action: str, data: any, user_id: str) -> dict:
             if not query:
                 return {"message": "❌ Search query missing."}
             
-            videos = youtube.search_videos(query=query, max_results=5)
+            videos = await youtube.asearch_videos(query=query, max_results=5)
             if not videos:
                 return {"message": f"🎥 No videos found for '{query}'."}
             
@@ -140,7 +140,7 @@ async def execute_action(action: str, data: any, user_id: str) -> dict:
             if not text:
                 return {"message": "❌ Tweet text missing."}
             
-            tweet = x_integration.post_tweet(text=text)
+            tweet = await x_integration.apost_tweet(text=text)
             if tweet:
                 return {"message": f"✅ Tweet posted! {tweet['url']}", "tweet": tweet}
             else:
@@ -380,20 +380,14 @@ async def chat(request: ChatRequest):
             action = None
             action_data = None
         
-        # Save user message (original message in user's language)
-        memory_manager.save_message(
+        # Save user message (original message in user's language) and assistant response together
+        memory_manager.save_messages(
             session_id=request.session_id,
             user_id=request.user_id,
-            role="user",
-            content=original_message
-        )
-        
-        # Save assistant response
-        memory_manager.save_message(
-            session_id=request.session_id,
-            user_id=request.user_id,
-            role="assistant",
-            content=assistant_message
+            items=[
+                ("user", original_message),
+                ("assistant", assistant_message),
+            ]
         )
         
         # Update conversation context with this exchange
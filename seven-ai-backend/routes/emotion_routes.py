@@ -5,6 +5,7 @@ Emotion Routes - Handle emotion detection from text and voice
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 
 from core.emotion import emotion_detector
 from core.utils import format_success_response, format_error_response
@@ -20,6 +21,7 @@ class CombinedEmotionRequest(BaseModel):
     text: str
     audio_data: Optional[str] = None  # base64 encoded audio
     sample_rate: Optional[int] = 16000
+    raw_pcm: Optional[bool] = False  # audio_data is headerless mono PCM16, not an audio file
 
 
 @router.post("/emotion/text")
@@ -35,7 +37,8 @@ async def analyze_text_emotion(request: TextEmotionRequest):
                 "Emotion detection not available. Install required packages: transformers, torch"
             )
         
-        result = emotion_detector.analyze_text(request.text)
+        # Off the event loop so concurrent requests can share a model batch
+        result = await asyncio.to_thread(emotion_detector.analyze_text, request.text)
         
         return format_success_response({
             "emotion": result
@@ -46,23 +49,28 @@ async def analyze_text_emotion(request: TextEmotionRequest):
 
 
 @router.post("/emotion/voice")
-async def analyze_voice_emotion(audio: UploadFile = File(...)):
+async def analyze_voice_emotion(audio: UploadFile = File(...), sample_rate: int = Form(16000)):
     """
     Analyze emotion from voice audio
     
-    Accepts audio file upload (WAV, MP3, etc.)
+    Accepts audio file upload (WAV, MP3, etc.), or raw mono PCM16 sent as
+    audio/L16 (or audio/pcm) at the given sample_rate
     Returns emotion based on pitch, intensity, and tempo
     """
     try:
         if not emotion_detector.is_available():
             return format_error_response(
-                "Emotion detection not available. Install required packages: librosa, soundfile"
+                "Emotion detection not available. Install required packages: scipy, soundfile"
             )
         
         # Read audio file
         audio_data = await audio.read()
         
-        result = emotion_detector.analyze_voice(audio_data)
+        result = emotion_detector.analyze_voice(
+            audio_data,
+            sample_rate,
+            raw_pcm=emotion_detector.is_raw_pcm_content_type(audio.content_type)
+        )
         
         return format_success_response({
             "emotion": result
@@ -97,7 +105,8 @@ async def analyze_combined_emotion(request: CombinedEmotionRequest):
         result = emotion_detector.analyze_combined(
             text=request.text,
             audio_data=audio_bytes,
-            sample_rate=request.sample_rate
+            sample_rate=request.sample_rate,
+            raw_pcm=bool(request.raw_pcm)
         )
         
         return format_success_response({
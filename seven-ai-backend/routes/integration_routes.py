@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, List
 from datetime import datetime
+import asyncio
 
 from core.integrations import integration_manager, google_calendar, gmail, youtube, x_integration
 from core.utils import format_success_response, format_error_response
@@ -34,6 +35,14 @@ class CreateCalendarEventRequest(BaseModel):
     location: Optional[str] = ""
 
 
+class EmailAttendeesRequest(BaseModel):
+    subject: str
+    body: str
+    max_events: Optional[int] = 1
+    days_ahead: Optional[int] = 7
+    from_email: Optional[str] = None
+
+
 class SendEmailRequest(BaseModel):
     to: str
     subject: str
@@ -41,6 +50,17 @@ class SendEmailRequest(BaseModel):
     from_email: Optional[str] = None
 
 
+class EmailItem(BaseModel):
+    to: str
+    subject: str
+    body: str
+
+
+class SendEmailBatchRequest(BaseModel):
+    emails: List[EmailItem]
+    from_email: Optional[str] = None
+
+
 class YouTubeSearchRequest(BaseModel):
     query: str
     max_results: Optional[int] = 10
@@ -54,18 +74,25 @@ class PostTweetRequest(BaseModel):
 # ===== Status & Setup =====
 
 @router.get("/integrations/status")
-async def get_integration_status():
+async def get_integration_status(check_reachability: bool = False):
     """
     Get status of all integrations
+    
+    With check_reachability=true, also pings each configured API host
+    and reports the result under "reachable"
     """
     try:
         status = integration_manager.get_status()
         actions = integration_manager.get_available_actions()
         
-        return format_success_response({
+        data = {
             "status": status,
             "available_actions": actions
-        })
+        }
+        if check_reachability:
+            data["reachable"] = await integration_manager.aget_reachability()
+        
+        return format_success_response(data)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -160,6 +187,56 @@ async def create_calendar_event(request: CreateCalendarEventRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/integrations/calendar/email-attendees")
+async def email_event_attendees(request: EmailAttendeesRequest):
+    """
+    Email the attendees of the next upcoming events
+    
+    The event lookup and the emails run as one pipelined batch: one Calendar
+    round trip, then one Gmail batch request for every attendee
+    """
+    try:
+        if not google_calendar.is_available():
+            return format_error_response("Google Calendar not configured")
+        if not gmail.is_available():
+            return format_error_response("Gmail not configured")
+        
+        from datetime import timedelta
+        time_min = datetime.utcnow()
+        time_max = time_min + timedelta(days=request.days_ahead)
+        
+        def recipients(events: List[Dict]) -> List[str]:
+            # Each attendee once, even if they are in several of the events
+            return list(dict.fromkeys(email for event in events for email in event['attendees']))
+        
+        events, sent = await asyncio.to_thread(integration_manager.batch_execute, [
+            {
+                "action": "list_calendar_events",
+                "args": {"max_results": request.max_events, "time_min": time_min, "time_max": time_max}
+            },
+            {
+                "action": "send_emails",
+                "args": {"from_email": request.from_email},
+                "input_from": 0,
+                "input_map": lambda events: {
+                    "messages": [(to, request.subject, request.body) for to in recipients(events)]
+                }
+            }
+        ])
+        
+        events = events or []
+        sent = sent or []
+        return format_success_response({
+            "events": [event['summary'] for event in events],
+            "sent": sum(sent),
+            "failed": len(sent) - sum(sent),
+            "results": [{"to": to, "sent": ok} for to, ok in zip(recipients(events), sent)]
+        })
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ===== Gmail =====
 
 @router.post("/integrations/gmail/send")
@@ -189,6 +266,34 @@ async def send_email(request: SendEmailRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/integrations/gmail/send-batch")
+async def send_email_batch(request: SendEmailBatchRequest):
+    """
+    Send several emails via Gmail in batched requests
+    """
+    try:
+        if not gmail.is_available():
+            return format_error_response("Gmail not configured")
+        
+        # Up to one Gmail round trip per 100 messages; keep it off the event loop
+        results = await asyncio.to_thread(
+            gmail.send_emails_batch,
+            [(email.to, email.subject, email.body) for email in request.emails],
+            from_email=request.from_email
+        )
+        
+        return format_success_response({
+            "sent": sum(results),
+            "failed": len(results) - sum(results),
+            "results": [
+                {"to": email.to, "sent": ok} for email, ok in zip(request.emails, results)
+            ]
+        })
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/integrations/gmail/recent")
 async def get_recent_emails(max_results: int = 10):
     """
@@ -220,7 +325,7 @@ async def search_youtube(request: YouTubeSearchRequest):
         if not youtube.is_available():
             return format_error_response("YouTube API not configured")
         
-        videos = youtube.search_videos(
+        videos = await youtube.asearch_videos(
             query=request.query,
             max_results=request.max_results,
             order=request.order
@@ -250,7 +355,7 @@ async def post_tweet(request: PostTweetRequest):
         if len(request.text) > 280:
             return format_error_response("Tweet exceeds 280 characters")
         
-        tweet = x_integration.post_tweet(request.text)
+        tweet = await x_integration.apost_tweet(request.text)
         
         if tweet:
             return format_success_response({
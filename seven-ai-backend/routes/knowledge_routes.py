@@ -22,12 +22,22 @@ class AddKnowledgeRequest(BaseModel):
     metadata: Optional[Dict] = None
 
 
+class AddKnowledgeBatchRequest(BaseModel):
+    entries: List[AddKnowledgeRequest]
+
+
 class QueryKnowledgeRequest(BaseModel):
     query: str
     top_k: Optional[int] = 3
     min_similarity: Optional[float] = 0.5
 
 
+class QueryKnowledgeBatchRequest(BaseModel):
+    queries: List[str]
+    top_k: Optional[int] = 3
+    min_similarity: Optional[float] = 0.5
+
+
 class DeleteKnowledgeRequest(BaseModel):
     entry_id: str
 
@@ -56,6 +66,30 @@ async def add_knowledge(request: AddKnowledgeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/knowledge/add-batch")
+async def add_knowledge_batch(request: AddKnowledgeBatchRequest):
+    """
+    Add several knowledge entries in one request (embedded in a single batch)
+    """
+    try:
+        if not knowledge_base.is_available():
+            return format_error_response(
+                "Knowledge base not available. Install FAISS and sentence-transformers."
+            )
+        
+        results = knowledge_base.add_knowledge_batch(
+            [entry.model_dump() for entry in request.entries]
+        )
+        
+        return format_success_response({
+            "results": results,
+            "added": sum(1 for result in results if result["status"] == "added")
+        })
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/knowledge/query")
 async def query_knowledge(request: QueryKnowledgeRequest):
     """
@@ -80,6 +114,30 @@ async def query_knowledge(request: QueryKnowledgeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/knowledge/query-batch")
+async def query_knowledge_batch(request: QueryKnowledgeBatchRequest):
+    """
+    Query knowledge base for several queries at once (one encode pass, one index search)
+    """
+    try:
+        if not knowledge_base.is_available():
+            return format_success_response({"results": [[] for _ in request.queries]})
+        
+        results = knowledge_base.query_knowledge_batch(
+            queries=request.queries,
+            top_k=request.top_k,
+            min_similarity=request.min_similarity
+        )
+        
+        return format_success_response({
+            "results": results,
+            "count": [len(hits) for hits in results]
+        })
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/knowledge/all")
 async def get_all_knowledge():
     """
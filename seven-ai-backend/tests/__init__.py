@@ -0,0 +1,16 @@
+"""
+Backend tests
+
+Run from seven-ai-backend with: python -m unittest
+
+Several core modules open their SQLite databases and data files at import time
+(relative to the working directory), so the tests run from a scratch directory
+and never touch the files in ./data.
+"""
+
+import os
+import tempfile
+
+_sandbox = tempfile.mkdtemp(prefix="seven-tests-")
+os.environ["DATABASE_PATH"] = os.path.join(_sandbox, "data", "memory.db")
+os.chdir(_sandbox)
@@ -0,0 +1,71 @@
+"""
+Databases shaped like the ones written before the schema migrations
+"""
+
+import json
+import sqlite3
+
+# memory.db tables as created before user_facts, the indexes and the versioned script
+MEMORY_SCHEMA_SQL = """
+    CREATE TABLE users (
+        user_id TEXT PRIMARY KEY,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE user_memory (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        memory_summary TEXT,
+        facts TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE chat_sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        title TEXT
+    );
+    CREATE TABLE messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE conversation_context (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        context_data TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(session_id)
+    );
+"""
+
+
+def create_memory_db(path: str, user_memory=(), sessions=(), messages=()):
+    """
+    Write a baseline memory.db
+    
+    Args:
+        user_memory: (user_id, memory_summary, facts list or None) rows, oldest first
+        sessions: (session_id, user_id) rows
+        messages: (session_id, user_id, role, content, timestamp) rows
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(MEMORY_SCHEMA_SQL)
+        conn.executemany(
+            "INSERT INTO user_memory (user_id, memory_summary, facts) VALUES (?, ?, ?)",
+            [(user_id, summary, None if facts is None else json.dumps(facts))
+             for user_id, summary, facts in user_memory]
+        )
+        conn.executemany("INSERT INTO chat_sessions (session_id, user_id) VALUES (?, ?)", sessions)
+        conn.executemany(
+            "INSERT INTO messages (session_id, user_id, role, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+            messages
+        )
+        conn.commit()
+    finally:
+        conn.close()
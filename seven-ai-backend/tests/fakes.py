@@ -0,0 +1,18 @@
+"""
+Stand-ins for heavy dependencies used by the tests
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class HashingEncoder:
+    """Deterministic stand-in for the sentence-transformers model (bag of hashed words)"""
+    
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        out = np.zeros((len(texts), 384), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, int(hashlib.md5(word.encode()).hexdigest(), 16) % 384] += 1
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
@@ -0,0 +1,44 @@
+"""
+ConversationContext round trip through to_dict / from_dict
+"""
+
+import unittest
+
+from core.conversation_context import ConversationContext, ConversationTopic
+
+
+def _topic(name: str) -> ConversationTopic:
+    return ConversationTopic(topic=name, keywords=[name], messages=[f"about {name}"], confidence=0.9)
+
+
+class ContextSerializationTest(unittest.TestCase):
+    def setUp(self):
+        self.context = ConversationContext()
+        # Five topic changes: more than the three kept in current_topics
+        for name in ("weather", "music", "travel", "food", "sports"):
+            self.context.reset_current_topic()
+            self.context.current_topic = _topic(name)
+    
+    def test_topic_count_survives_a_round_trip(self):
+        self.assertEqual(self.context.topic_count, 4)
+        
+        restored = ConversationContext()
+        restored.from_dict(self.context.to_dict())
+        self.assertEqual(restored.topic_count, 4)
+        self.assertEqual([t.topic for t in restored.current_topics], ["music", "travel", "food"])
+        self.assertEqual(restored.current_topic.topic, "sports")
+        
+        restored.reset_current_topic()
+        self.assertEqual(restored.topic_count, 5)
+    
+    def test_context_saved_without_topic_count(self):
+        data = self.context.to_dict()
+        del data["topic_count"]
+        
+        restored = ConversationContext()
+        restored.from_dict(data)
+        self.assertEqual(restored.topic_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Raw PCM16 versus audio-container input to EmotionDetector.analyze_voice
+"""
+
+import importlib.util
+import io
+import unittest
+
+import numpy as np
+
+from core.emotion import EmotionDetector, _get_voice_kernel
+
+SOUNDFILE_AVAILABLE = importlib.util.find_spec("soundfile") is not None
+VOICE_AVAILABLE = _get_voice_kernel() is not None
+
+SAMPLE_RATE = 16000
+
+
+def _speech_like_pcm(seconds: float = 1.5) -> np.ndarray:
+    """A gliding tone with a pulsing envelope, as int16 samples"""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    pitch = 180 + 40 * np.sin(2 * np.pi * 0.5 * t)
+    envelope = 0.5 + 0.4 * np.sin(2 * np.pi * 3 * t)
+    wave = envelope * np.sin(2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE)
+    return (wave * 20000).astype("<i2")
+
+
+class RawPcmContentTypeTest(unittest.TestCase):
+    def test_pcm_content_types(self):
+        for content_type in ("audio/L16", "audio/l16; rate=16000; channels=1", "audio/pcm", " AUDIO/RAW "):
+            self.assertTrue(EmotionDetector.is_raw_pcm_content_type(content_type), content_type)
+    
+    def test_container_content_types(self):
+        for content_type in ("audio/wav", "audio/webm;codecs=opus", "application/octet-stream", "", None):
+            self.assertFalse(EmotionDetector.is_raw_pcm_content_type(content_type), content_type)
+
+
+@unittest.skipUnless(VOICE_AVAILABLE, "voice analysis needs scipy")
+class VoiceInputTest(unittest.TestCase):
+    def setUp(self):
+        self.detector = EmotionDetector()
+        self.samples = _speech_like_pcm()
+    
+    def test_raw_pcm_is_analyzed(self):
+        result = self.detector.analyze_voice(self.samples.tobytes(), SAMPLE_RATE, raw_pcm=True)
+        self.assertEqual(result["source"], "voice")
+        self.assertGreater(result["intensity"], 0)
+    
+    @unittest.skipUnless(SOUNDFILE_AVAILABLE, "soundfile is not installed")
+    def test_wav_matches_the_same_samples_as_raw_pcm(self):
+        import soundfile as sf
+        
+        wav = io.BytesIO()
+        sf.write(wav, self.samples, SAMPLE_RATE, format="WAV", subtype="PCM_16")
+        
+        from_wav = self.detector.analyze_voice(wav.getvalue())
+        from_pcm = self.detector.analyze_voice(self.samples.tobytes(), SAMPLE_RATE, raw_pcm=True)
+        self.assertEqual(from_wav["source"], "voice")
+        self.assertEqual(from_wav, from_pcm)
+    
+    @unittest.skipUnless(SOUNDFILE_AVAILABLE, "soundfile is not installed")
+    def test_wav_bytes_are_not_taken_for_pcm_unless_flagged(self):
+        import soundfile as sf
+        
+        # Decoded through soundfile, the header doesn't leak into the samples
+        wav = io.BytesIO()
+        sf.write(wav, self.samples, 8000, format="WAV", subtype="PCM_16")
+        from_wav = self.detector.analyze_voice(wav.getvalue(), SAMPLE_RATE)
+        from_pcm = self.detector.analyze_voice(self.samples.tobytes(), 8000, raw_pcm=True)
+        self.assertEqual(from_wav, from_pcm)
+    
+    def test_unsupported_container_falls_back_to_default(self):
+        # EBML header of a WebM upload: not PCM, and not a format soundfile reads
+        webm = b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01" + bytes(4000)
+        self.assertEqual(self.detector.analyze_voice(webm), self.detector._default_emotion())
+    
+    def test_malformed_pcm_falls_back_to_default(self):
+        default = self.detector._default_emotion()
+        self.assertEqual(self.detector.analyze_voice(b"", raw_pcm=True), default)
+        self.assertEqual(self.detector.analyze_voice(self.samples.tobytes()[:-1], raw_pcm=True), default)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Migration of a learning_insights table created before pattern_key existed
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from core.feedback import FeedbackManager
+
+# learning_insights as created before the pattern_key column
+BASELINE_INSIGHTS_SQL = """
+    CREATE TABLE learning_insights (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        insight_type TEXT NOT NULL,
+        pattern TEXT,
+        correction TEXT,
+        frequency INTEGER DEFAULT 1,
+        last_seen TEXT NOT NULL,
+        applied_to_memory INTEGER DEFAULT 0
+    )
+"""
+
+
+class PatternKeyMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "feedback.db")
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(BASELINE_INSIGHTS_SQL)
+        conn.executemany(
+            """
+            INSERT INTO learning_insights (user_id, insight_type, pattern, correction, frequency, last_seen)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                # Same pattern once case and whitespace are normalized
+                ("alice", "correction", "Hello  World", "Hi there", 3, "2024-01-01T00:00:00"),
+                ("alice", "correction", "hello world", "Hi there", 2, "2024-02-01T00:00:00"),
+                ("alice", "correction", "what time is it", "Use 24h time", 1, "2024-01-15T00:00:00"),
+                ("bob", "correction", "hello world", "Hey", 1, "2024-01-10T00:00:00"),
+            ]
+        )
+        conn.commit()
+        conn.close()
+    
+    def _open(self) -> FeedbackManager:
+        manager = FeedbackManager(self.db_path)
+        self.addCleanup(manager._conn.close)
+        return manager
+    
+    def _rows(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute("""
+                SELECT user_id, pattern, frequency, last_seen, pattern_key
+                FROM learning_insights ORDER BY user_id, frequency DESC
+            """).fetchall()
+        finally:
+            conn.close()
+    
+    def test_keys_backfilled_and_duplicates_merged(self):
+        self._open()
+        rows = self._rows()
+        
+        self.assertEqual(len(rows), 3)
+        self.assertTrue(all(row[4] is not None for row in rows))
+        merged = rows[0]
+        self.assertEqual(merged[:4], ("alice", "Hello  World", 5, "2024-02-01T00:00:00"))
+        self.assertEqual(merged[4], FeedbackManager._pattern_key("hello world"))
+    
+    def test_rerun_is_idempotent(self):
+        self._open()
+        before = self._rows()
+        self._open()
+        self.assertEqual(self._rows(), before)
+    
+    def test_corrections_upsert_into_migrated_rows(self):
+        manager = self._open()
+        manager.add_feedback(
+            user_id="alice",
+            message_id="m1",
+            feedback_type="correction",
+            correction="Hi there",
+            user_message="HELLO world"
+        )
+        rows = [row for row in self._rows() if row[0] == "alice"]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0][2], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
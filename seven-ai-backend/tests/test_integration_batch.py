@@ -0,0 +1,92 @@
+"""
+Dependency layers and Gmail folding in IntegrationManager.batch_execute
+"""
+
+import unittest
+from unittest import mock
+
+from core import integrations
+
+EVENTS = [
+    {"summary": "Standup", "attendees": ["ana@example.com", "ben@example.com"]},
+    {"summary": "Review", "attendees": ["ben@example.com"]},
+]
+
+
+class BatchExecuteTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        
+        def list_events(**kwargs):
+            self.calls.append(("list_events", kwargs))
+            return list(EVENTS)
+        
+        def send_email(to, subject, body, from_email=None):
+            self.calls.append(("send_email", to))
+            return True
+        
+        def send_emails_batch(messages, from_email=None):
+            self.calls.append(("send_emails_batch", [to for to, _, _ in messages], from_email))
+            return [not to.startswith("bad") for to, _, _ in messages]
+        
+        for patcher in (
+            mock.patch.object(integrations.google_calendar, "list_events", list_events),
+            mock.patch.object(integrations.gmail, "send_email", send_email),
+            mock.patch.object(integrations.gmail, "send_emails_batch", send_emails_batch),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manager = integrations.IntegrationManager()
+    
+    def test_dependent_call_gets_the_earlier_result(self):
+        events, sent = self.manager.batch_execute([
+            {"action": "list_calendar_events", "args": {"max_results": 2}},
+            {
+                "action": "send_emails",
+                "args": {"from_email": "me@example.com"},
+                "input_from": 0,
+                "input_map": lambda events: {
+                    "messages": [(to, "Hi", "Body") for event in events for to in event["attendees"]]
+                }
+            },
+        ])
+        self.assertEqual(events, EVENTS)
+        self.assertEqual(sent, [True, True, True])
+        self.assertEqual(self.calls, [
+            ("list_events", {"max_results": 2}),
+            ("send_emails_batch", ["ana@example.com", "ben@example.com", "ben@example.com"], "me@example.com"),
+        ])
+    
+    def test_single_emails_in_a_layer_share_one_batch_per_sender(self):
+        results = self.manager.batch_execute([
+            {"action": "send_email", "args": {"to": "a@example.com", "subject": "s", "body": "b"}},
+            {"action": "send_email", "args": {"to": "bad@example.com", "subject": "s", "body": "b"}},
+            {"action": "send_email", "args": {"to": "c@example.com", "subject": "s", "body": "b",
+                                              "from_email": "other@example.com"}},
+        ])
+        self.assertEqual(results, [True, False, True])
+        self.assertCountEqual(self.calls, [
+            ("send_emails_batch", ["a@example.com", "bad@example.com"], None),
+            ("send_email", "c@example.com"),
+        ])
+    
+    def test_failed_dependency_skips_dependents(self):
+        results = self.manager.batch_execute([
+            {"action": "list_calendar_events"},
+            {"action": "send_emails", "input_from": 0, "input_map": lambda events: 1 / 0},
+            {"action": "send_email", "input_from": 1, "input_map": lambda sent: {}},
+        ])
+        self.assertEqual(results, [EVENTS, None, None])
+        self.assertEqual([call[0] for call in self.calls], ["list_events"])
+    
+    def test_invalid_calls_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.manager.batch_execute([{"action": "list_calendar_events", "input_from": 0}])
+        with self.assertRaises(ValueError):
+            self.manager.batch_execute([{"action": "list_calendar_events"}, {"action": "send_email", "input_from": 0}])
+        with self.assertRaises(ValueError):
+            self.manager.batch_execute([{"action": "delete_everything"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
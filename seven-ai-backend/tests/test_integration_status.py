@@ -0,0 +1,45 @@
+"""
+IntegrationManager status: configuration checks, and the opt-in reachability pings
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from core import integrations
+
+
+class IntegrationStatusTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.manager = integrations.IntegrationManager()
+    
+    def test_status_reports_configuration(self):
+        with mock.patch.object(integrations.youtube, "available", True), \
+                mock.patch.object(integrations.x_integration, "available", False):
+            status = self.manager.get_status()
+        self.assertEqual(list(status), list(self.manager.STATUS_KEYS))
+        self.assertTrue(status["youtube"])
+        self.assertFalse(status["x"])
+    
+    async def test_reachability_pings_run_concurrently(self):
+        async def slow_check():
+            await asyncio.sleep(0.2)
+            return True
+        
+        patchers = [
+            mock.patch.object(integration, "acheck", slow_check)
+            for integration in self.manager._integrations
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        start = time.perf_counter()
+        reachable = await self.manager.aget_reachability()
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(reachable, dict.fromkeys(self.manager.STATUS_KEYS, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+Saved embedding rows stay aligned with knowledge entries
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from core import knowledge
+from tests.fakes import HashingEncoder
+
+
+@unittest.skipUnless(knowledge.FAISS_AVAILABLE, "faiss is not installed")
+class EmbeddingAlignmentTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = self.tmp.name
+        
+        for patcher in (
+            mock.patch.object(knowledge, "TRANSFORMERS_AVAILABLE", True),
+            mock.patch.object(knowledge, "get_embedder", HashingEncoder),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        self.entries = [
+            kb.add_knowledge(f"fact number {i} about topic{i}", title=f"Fact {i}")["entry"]
+            for i in range(5)
+        ]
+        kb.flush()
+    
+    def _assert_aligned(self, kb):
+        self.assertEqual(len(kb._embeddings), len(kb.knowledge_entries))
+        expected = HashingEncoder().encode([entry["content"] for entry in kb.knowledge_entries])
+        np.testing.assert_allclose(kb._embeddings, expected, atol=0.02)
+    
+    def test_missing_embeddings_file_is_restored_from_index(self):
+        os.remove(os.path.join(self.data_dir, "knowledge_embeddings.npy"))
+        
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        kb.add_knowledge("a sixth fact about topic6", title="Fact 6")
+        self._assert_aligned(kb)
+        
+        self.assertTrue(kb.delete_knowledge(self.entries[1]["id"]))
+        self.assertEqual(kb.index.ntotal, 5)
+        self._assert_aligned(kb)
+        
+        hits = kb.query_knowledge("fact number 3 about topic3", top_k=1)
+        self.assertEqual(hits[0]["id"], self.entries[3]["id"])
+    
+    def test_stale_embeddings_snapshot_is_completed_from_index(self):
+        embeddings_file = os.path.join(self.data_dir, "knowledge_embeddings.npy")
+        np.save(embeddings_file, np.load(embeddings_file)[:2])
+        
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        self._assert_aligned(kb)
+        self.assertTrue(kb.delete_knowledge(self.entries[4]["id"]))
+        self._assert_aligned(kb)
+        
+        # The snapshot written by the delete reloads as the full matrix
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        self.assertEqual(len(kb._embeddings), 4)
+        self._assert_aligned(kb)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Conversion of the single-document knowledge.json to knowledge.jsonl
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import knowledge
+
+# Entries as the JSON-document version wrote them
+BASELINE_ENTRIES = [
+    {
+        "id": "5d41402abc4b2a76b9719d911017c592",
+        "title": "Office hours",
+        "content": "The office is open 9am to 5pm",
+        "category": "general",
+        "source": "manual",
+        "created_at": "2024-01-01T09:00:00",
+        "metadata": {}
+    },
+    {
+        "id": "7d793037a0760186574b0282f2f435e7",
+        "title": "Café",
+        "content": "Café opens at 8am",
+        "category": "general",
+        "source": "manual",
+        "created_at": "2024-01-02T09:00:00",
+        "metadata": {"tags": ["food"]}
+    },
+]
+
+
+@unittest.skipUnless(knowledge.FAISS_AVAILABLE, "faiss is not installed")
+class KnowledgeFileMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.data_dir = self.tmp.name
+        with open(os.path.join(self.data_dir, "knowledge.json"), "w", encoding="utf-8") as f:
+            json.dump(BASELINE_ENTRIES, f, indent=2, ensure_ascii=False)
+        
+        # Loading and converting entries never needs the embedding model itself
+        patcher = mock.patch.object(knowledge, "TRANSFORMERS_AVAILABLE", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _read_lines(self):
+        with open(os.path.join(self.data_dir, "knowledge.jsonl"), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    
+    def test_json_document_converted_to_lines(self):
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        
+        lines = self._read_lines()
+        self.assertEqual([entry["id"] for entry in lines], [entry["id"] for entry in BASELINE_ENTRIES])
+        self.assertEqual(lines[1]["title"], "Café")
+        self.assertEqual(lines[1]["metadata"], {"tags": ["food"]})
+        # Older entries get vector ids; everything else is carried over unchanged
+        self.assertEqual([entry["faiss_id"] for entry in lines], [0, 1])
+        for entry, original in zip(lines, BASELINE_ENTRIES):
+            self.assertEqual({k: v for k, v in entry.items() if k != "faiss_id"}, original)
+        self.assertEqual(kb.get_all_knowledge(), lines)
+    
+    def test_converted_file_is_preferred_on_reload(self):
+        knowledge.KnowledgeBase(data_dir=self.data_dir)
+        # A stale legacy file must not override the JSON Lines file
+        with open(os.path.join(self.data_dir, "knowledge.json"), "w", encoding="utf-8") as f:
+            json.dump([], f)
+        
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        self.assertEqual(len(kb.get_all_knowledge()), len(BASELINE_ENTRIES))
+    
+    def test_torn_last_line_is_dropped(self):
+        knowledge.KnowledgeBase(data_dir=self.data_dir)
+        with open(os.path.join(self.data_dir, "knowledge.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"id": "cut short')
+        
+        kb = knowledge.KnowledgeBase(data_dir=self.data_dir)
+        self.assertEqual(len(kb.get_all_knowledge()), len(BASELINE_ENTRIES))
+        self.assertEqual(len(self._read_lines()), len(BASELINE_ENTRIES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+KnowledgeBase.query_knowledge_batch against one-at-a-time queries
+"""
+
+import tempfile
+import unittest
+from unittest import mock
+
+from core import knowledge
+from tests.fakes import HashingEncoder
+
+ENTRIES = [
+    "the office opens at nine",
+    "lunch is served at noon",
+    "the parking garage closes at midnight",
+    "wifi password is on the fridge",
+]
+
+
+@unittest.skipUnless(knowledge.FAISS_AVAILABLE, "faiss is not installed")
+class QueryBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for patcher in (
+            mock.patch.object(knowledge, "TRANSFORMERS_AVAILABLE", True),
+            mock.patch.object(knowledge, "get_embedder", HashingEncoder),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.kb = knowledge.KnowledgeBase(data_dir=self.tmp.name)
+        self.kb.add_knowledge_batch([{"content": content} for content in ENTRIES])
+    
+    def test_matches_single_queries_in_order(self):
+        queries = ["when does the office open", "wifi password", "parking garage hours"]
+        batched = self.kb.query_knowledge_batch(queries, top_k=2, min_similarity=0.1)
+        
+        self.assertEqual(len(batched), len(queries))
+        for query, hits in zip(queries, batched):
+            self.assertEqual(hits, self.kb.query_knowledge(query, top_k=2, min_similarity=0.1))
+        self.assertEqual(batched[1][0]["content"], ENTRIES[3])
+    
+    def test_no_queries_or_no_hits(self):
+        self.assertEqual(self.kb.query_knowledge_batch([]), [])
+        self.assertEqual(self.kb.query_knowledge_batch(["zebra xylophone"], min_similarity=0.5), [[]])
+
+
+if __name__ == "__main__":
+    unittest.main()
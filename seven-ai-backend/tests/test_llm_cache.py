@@ -0,0 +1,54 @@
+"""
+Exact-match response cache in front of LLMClient.chat
+"""
+
+import unittest
+
+from core.llm import LLMClient
+
+MESSAGES = [{"role": "user", "content": "Tell me a joke"}]
+
+
+class ResponseCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = LLMClient()
+        self.calls = 0
+        self.client._route_chat = self._route
+    
+    async def asyncTearDown(self):
+        await self.client.close()
+    
+    async def _route(self, messages, provider, temperature, max_tokens, stream):
+        self.calls += 1
+        return {"message": f"reply {self.calls}", "provider": "test", "model": "test"}
+    
+    async def test_deterministic_calls_are_cached(self):
+        first = await self.client.chat(MESSAGES, temperature=0)
+        self.assertEqual(await self.client.chat(MESSAGES, temperature=0), first)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.client.get_cache_stats()["hits"], 1)
+    
+    async def test_sampled_calls_are_not_cached(self):
+        first = await self.client.chat(MESSAGES, temperature=0.7)
+        second = await self.client.chat(MESSAGES, temperature=0.7)
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.calls, 2)
+    
+    async def test_time_sensitive_prompts_are_not_cached(self):
+        messages = [{"role": "user", "content": "What is the weather today?"}]
+        await self.client.chat(messages, temperature=0)
+        await self.client.chat(messages, temperature=0)
+        self.assertEqual(self.calls, 2)
+    
+    async def test_cached_reply_is_a_copy(self):
+        reply = await self.client.chat(MESSAGES, temperature=0)
+        reply["message"] = "changed by the caller"
+        self.assertEqual((await self.client.chat(MESSAGES, temperature=0))["message"], "reply 1")
+        
+        self.client.clear_cache()
+        await self.client.chat(MESSAGES, temperature=0)
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Single-flight de-duplication of concurrent identical requests in LLMClient.chat
+"""
+
+import asyncio
+import unittest
+
+from core.llm import LLMClient
+
+MESSAGES = [{"role": "user", "content": "Tell me a joke"}]
+REPLY = {"message": "Why did the chicken cross the road?", "provider": "test", "model": "test"}
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = LLMClient()
+        self.calls = 0
+        self.release = asyncio.Event()
+    
+    async def asyncTearDown(self):
+        await self.client.close()
+    
+    async def _slow_route(self, messages, provider, temperature, max_tokens, stream):
+        self.calls += 1
+        await self.release.wait()
+        return dict(REPLY)
+    
+    async def _failing_route(self, messages, provider, temperature, max_tokens, stream):
+        self.calls += 1
+        await self.release.wait()
+        raise RuntimeError("provider down")
+    
+    async def _start(self, count: int, **kwargs):
+        tasks = [asyncio.create_task(self.client.chat(MESSAGES, **kwargs)) for _ in range(count)]
+        await asyncio.sleep(0)  # Let every request reach the in-flight check
+        return tasks
+    
+    async def test_identical_requests_share_one_call(self):
+        self.client._route_chat = self._slow_route
+        tasks = await self._start(5)
+        self.release.set()
+        
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [REPLY] * 5)
+        self.assertEqual(self.client._inflight, {})
+    
+    async def test_different_requests_are_not_merged(self):
+        self.client._route_chat = self._slow_route
+        self.release.set()
+        await asyncio.gather(
+            self.client.chat(MESSAGES, temperature=0.1),
+            self.client.chat(MESSAGES, temperature=0.9)
+        )
+        self.assertEqual(self.calls, 2)
+    
+    async def test_error_reaches_every_waiter_and_is_not_reused(self):
+        self.client._route_chat = self._failing_route
+        tasks = await self._start(3)
+        self.release.set()
+        
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(self.client._inflight, {})
+        
+        self.client._route_chat = self._slow_route
+        self.assertEqual(await self.client.chat(MESSAGES), REPLY)
+        self.assertEqual(self.calls, 2)
+    
+    async def test_cancelled_leader_does_not_cancel_waiters(self):
+        self.client._route_chat = self._slow_route
+        leader, follower = await self._start(2)
+        leader.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+        
+        self.assertEqual(await follower, REPLY)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Migration of user_memory.facts (a JSON list) to the user_facts table
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from core import memory
+from tests.baseline import create_memory_db
+
+
+class UserFactsMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "memory.db")
+        create_memory_db(self.db_path, user_memory=[
+            ("alice", "summary", ["likes tea", "lives in Accra", "ünïcode fact"]),
+            ("bob", "", []),
+            ("carol", "no facts", None),
+        ])
+        
+        patcher = mock.patch.object(memory, "DATABASE_PATH", self.db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        memory.initialize_database()
+        self.manager = memory.MemoryManager()
+        self.addCleanup(self.manager.close)
+    
+    def test_facts_move_to_user_facts_in_order(self):
+        alice = self.manager.get_user_memory("alice")
+        self.assertEqual(alice["memory_summary"], "summary")
+        self.assertEqual(alice["facts"], ["likes tea", "lives in Accra", "ünïcode fact"])
+        self.assertEqual(self.manager.get_user_memory("bob")["facts"], [])
+        self.assertEqual(self.manager.get_user_memory("carol")["facts"], [])
+        
+        conn = sqlite3.connect(self.db_path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM user_memory WHERE facts IS NOT NULL").fetchone()[0], 0)
+    
+    def test_updates_after_migration(self):
+        self.manager.add_memories("alice", ["plays chess"])
+        self.assertEqual(
+            self.manager.get_user_memory("alice")["facts"],
+            ["likes tea", "lives in Accra", "ünïcode fact", "plays chess"]
+        )
+        
+        self.manager.update_user_memory("alice", "new summary", ["only fact"])
+        alice = self.manager.get_user_memory("alice")
+        self.assertEqual(alice["memory_summary"], "new summary")
+        self.assertEqual(alice["facts"], ["only fact"])
+    
+    def test_new_user_facts(self):
+        self.manager.add_memories("dave", ["first", "second"])
+        dave = self.manager.get_user_memory("dave")
+        self.assertEqual(dave["memory_summary"], "")
+        self.assertEqual(dave["facts"], ["first", "second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
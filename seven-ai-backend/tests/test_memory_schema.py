@@ -0,0 +1,88 @@
+"""
+Versioned schema script in memory.initialize_database
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from core import memory
+from tests.baseline import create_memory_db
+
+
+class SchemaVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_path = os.path.join(self.tmp.name, "memory.db")
+        create_memory_db(self.db_path, user_memory=[
+            ("alice", "old summary", ["stale fact"]),
+            ("alice", "summary", ["likes tea", "lives in Accra"]),
+            ("bob", "", []),
+        ])
+        
+        patcher = mock.patch.object(memory, "DATABASE_PATH", self.db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _query(self, sql: str):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+    
+    def _index_names(self):
+        return {name for (name,) in self._query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    
+    def test_baseline_database_is_stamped(self):
+        self.assertEqual(self._query("PRAGMA user_version"), [(0,)])
+        memory.initialize_database()
+        self.assertEqual(self._query("PRAGMA user_version"), [(memory.SCHEMA_VERSION,)])
+        self.assertIn("idx_user_memory_user", self._index_names())
+    
+    def test_current_database_skips_the_script(self):
+        memory.initialize_database()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DROP INDEX idx_messages_user")
+        conn.close()
+        
+        memory.initialize_database()
+        self.assertNotIn("idx_messages_user", self._index_names())
+        
+        # An older stamp re-runs the whole script
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+        memory.initialize_database()
+        self.assertIn("idx_messages_user", self._index_names())
+    
+    def test_duplicates_dropped_before_facts_move(self):
+        memory.initialize_database()
+        # Only the newest alice row survives, and only its facts are carried over
+        self.assertEqual(
+            self._query("SELECT user_id, memory_summary FROM user_memory ORDER BY user_id"),
+            [("alice", "summary"), ("bob", "")]
+        )
+        self.assertEqual(
+            self._query("SELECT fact FROM user_facts WHERE user_id = 'alice' ORDER BY id"),
+            [("likes tea",), ("lives in Accra",)]
+        )
+    
+    def test_rerunning_the_script_is_idempotent(self):
+        memory.initialize_database()
+        before = self._query("SELECT user_id, fact FROM user_facts ORDER BY id")
+        
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA user_version = 0")
+        conn.close()
+        memory.initialize_database()
+        
+        self.assertEqual(self._query("SELECT user_id, fact FROM user_facts ORDER BY id"), before)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM user_memory"), [(2,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
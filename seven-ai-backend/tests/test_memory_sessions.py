@@ -0,0 +1,68 @@
+"""
+Session message reads on a database migrated from the baseline layout
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import memory
+from tests.baseline import create_memory_db
+
+# A user/assistant pair saved in the same second, then a later message
+MESSAGES = [
+    ("s1", "alice", "user", "hi", "2024-01-01 10:00:00"),
+    ("s1", "alice", "assistant", "hello", "2024-01-01 10:00:00"),
+    ("s1", "alice", "user", "bye", "2024-01-01 10:00:05"),
+    ("s2", "alice", "user", "other session", "2024-01-01 09:00:00"),
+]
+
+
+class SessionMessagesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        db_path = os.path.join(self.tmp.name, "memory.db")
+        create_memory_db(db_path, sessions=[("s1", "alice")], messages=MESSAGES)
+        
+        patcher = mock.patch.object(memory, "DATABASE_PATH", db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        memory.initialize_database()
+        self.manager = memory.MemoryManager()
+        self.addCleanup(self.manager.close)
+    
+    def _contents(self, session_id: str, limit=50):
+        return [message["content"] for message in self.manager.get_session_messages(session_id, limit=limit)]
+    
+    def test_messages_oldest_first(self):
+        self.assertEqual(self._contents("s1"), ["hi", "hello", "bye"])
+        self.assertEqual(self._contents("s1", limit=None), ["hi", "hello", "bye"])
+    
+    def test_limit_keeps_the_newest(self):
+        self.assertEqual(self._contents("s1", limit=2), ["hello", "bye"])
+        self.assertEqual(self._contents("s1", limit=1), ["bye"])
+    
+    def test_saved_pair_keeps_its_order(self):
+        self.manager.save_messages("s1", "alice", [("user", "again"), ("assistant", "sure")])
+        self.assertEqual(self._contents("s1", limit=2), ["again", "sure"])
+    
+    def test_delete_session_removes_messages_and_context(self):
+        self.manager.save_conversation_context("s1", "alice", {"topics": ["greetings"]})
+        self.manager.delete_session("s1")
+        
+        self.assertEqual(self._contents("s1"), [])
+        self.assertIsNone(self.manager.get_conversation_context("s1"))
+        self.assertEqual(self._contents("s2"), ["other session"])
+    
+    def test_delete_unregistered_session(self):
+        # s2 has messages but was never added to chat_sessions
+        self.manager.delete_session("s2")
+        self.assertEqual(self._contents("s2"), [])
+        self.assertEqual(self._contents("s1"), ["hi", "hello", "bye"])
+
+
+if __name__ == "__main__":
+    unittest.main()
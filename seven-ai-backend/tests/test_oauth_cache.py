@@ -0,0 +1,70 @@
+"""
+Encrypted OAuth credentials cache
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from core import integrations
+
+CREDENTIALS = {"token": "ya29.access", "refresh_token": "1//refresh-secret", "client_id": "id"}
+
+
+@unittest.skipUnless(integrations.FERNET_AVAILABLE, "cryptography is not installed")
+class OAuthCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_file = os.path.join(tmp.name, "oauth_cache.json")
+        self._configure(integrations.Fernet.generate_key().decode())
+    
+    def _configure(self, secret: str):
+        for patcher in (
+            mock.patch.object(integrations, "OAUTH_CACHE_FILE", self.cache_file),
+            mock.patch.object(integrations, "OAUTH_CACHE_SECRET", secret),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        integrations._oauth_cipher.cache_clear()
+        self.addCleanup(integrations._oauth_cipher.cache_clear)
+    
+    def _raw(self) -> bytes:
+        with open(self.cache_file, "rb") as f:
+            return f.read()
+    
+    def test_round_trip_is_encrypted(self):
+        integrations._write_oauth_cache("gmail", CREDENTIALS)
+        integrations._write_oauth_cache("google_calendar", {**CREDENTIALS, "token": "other"})
+        
+        self.assertNotIn(b"refresh-secret", self._raw())
+        self.assertEqual(os.stat(self.cache_file).st_mode & 0o777, 0o600)
+        cache = integrations._read_oauth_cache()
+        self.assertEqual(cache["gmail"], CREDENTIALS)
+        self.assertEqual(cache["google_calendar"]["token"], "other")
+    
+    def test_plaintext_cache_is_read_then_rewritten_encrypted(self):
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump({"gmail": CREDENTIALS}, f)
+        
+        self.assertEqual(integrations._read_oauth_cache(), {"gmail": CREDENTIALS})
+        integrations._write_oauth_cache("google_calendar", CREDENTIALS)
+        self.assertNotIn(b"refresh-secret", self._raw())
+        self.assertEqual(set(integrations._read_oauth_cache()), {"gmail", "google_calendar"})
+    
+    def test_other_key_is_ignored(self):
+        integrations._write_oauth_cache("gmail", CREDENTIALS)
+        self._configure(integrations.Fernet.generate_key().decode())
+        self.assertEqual(integrations._read_oauth_cache(), {})
+    
+    def test_no_secret_means_no_cache(self):
+        self._configure("")
+        integrations._write_oauth_cache("gmail", CREDENTIALS)
+        self.assertFalse(os.path.exists(self.cache_file))
+        self.assertEqual(integrations._read_oauth_cache(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()